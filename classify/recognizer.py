@@ -21,36 +21,63 @@ resnet = models.resnet18(pretrained=True)
 feature_extractor = nn.Sequential(*list(resnet.children())[:-1])
 feature_extractor.eval()
 
+# Tiles por forward da ResNet (configurável por chamada)
+BATCH_SIZE = 256
+
+def iter_embeddings(images, batch_size: int = BATCH_SIZE):
+    """
+    Gera lotes de embeddings (B, 512) para um iterável de imagens PIL, na mesma ordem.
+    As imagens são consumidas sob demanda, então aceita um fluxo de vários screenshots.
+    """
+    batch = []
+    for img in images:
+        batch.append(preprocess(img))
+        if len(batch) == batch_size:
+            yield _forward(batch)
+            batch = []
+    if batch:
+        yield _forward(batch)
+
+def _forward(tensors: list) -> np.ndarray:
+    with torch.inference_mode():
+        feat = feature_extractor(torch.stack(tensors))
+    return feat.flatten(1).numpy()
+
+def get_embeddings(images, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    chunks = list(iter_embeddings(images, batch_size))
+    return np.concatenate(chunks) if chunks else np.zeros((0, 512), dtype=np.float32)
+
 def get_embedding(img: Image.Image) -> np.ndarray:
-    img_tensor = preprocess(img).unsqueeze(0)
-    with torch.no_grad():
-        feat = feature_extractor(img_tensor)
-    return feat.view(-1).numpy()  # vetor 512D
+    return get_embeddings([img])[0]  # vetor 512D
 
-def load_all_embeddings_from_folders(folder_path: str) -> list:
+def load_all_embeddings_from_folders(folder_path: str, batch_size: int = BATCH_SIZE) -> list:
     """
     Retorna uma lista de (vetor, label) para todas as imagens nas subpastas.
     """
-    labeled_embeddings = []
+    paths, labels = [], []
     for label in sorted(os.listdir(folder_path)):
         label_dir = os.path.join(folder_path, label)
         if not os.path.isdir(label_dir):
             continue
         for fname in os.listdir(label_dir):
             if fname.lower().endswith((".png", ".jpg", ".jpeg")):
-                img_path = os.path.join(label_dir, fname)
-                img = Image.open(img_path).convert("RGB")
-                emb = get_embedding(img)
-                labeled_embeddings.append((emb, label))
-    return labeled_embeddings
+                paths.append(os.path.join(label_dir, fname))
+                labels.append(label)
+    images = (Image.open(path).convert("RGB") for path in paths)
+    return list(zip(get_embeddings(images, batch_size), labels))
+
+def classify_batch(tile_imgs, labeled_embeddings: list, batch_size: int = BATCH_SIZE) -> list:
+    """
+    Classifica um iterável de tiles pelo vizinho mais próximo (similaridade de cosseno),
+    com um forward por lote em vez de um por tile.
+    """
+    ref_matrix = np.stack([emb for emb, _ in labeled_embeddings])
+    ref_labels = [label for _, label in labeled_embeddings]
+    predicted = []
+    for emb in iter_embeddings(tile_imgs, batch_size):
+        best = cosine_similarity(emb, ref_matrix).argmax(axis=1)
+        predicted.extend(ref_labels[i] for i in best)
+    return predicted
 
 def classify_by_knn(tile_img: Image.Image, labeled_embeddings: list) -> str:
-    tile_emb = get_embedding(tile_img).reshape(1, -1)
-    best_label = None
-    best_score = -1
-    for ref_emb, ref_label in labeled_embeddings:
-        score = cosine_similarity(tile_emb, ref_emb.reshape(1, -1))[0][0]
-        if score > best_score:
-            best_score = score
-            best_label = ref_label
-    return best_label
+    return classify_batch([tile_img], labeled_embeddings)[0]
@@ -1,7 +1,8 @@
 import os
 import sys
+from itertools import chain
 from PIL import Image
-from classify.recognizer import load_all_embeddings_from_folders, classify_by_knn
+from classify.recognizer import load_all_embeddings_from_folders, classify_batch
 
 # Adiciona 'src' ao path para importar o módulo 'levels'
 repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "."))
@@ -14,6 +15,7 @@ from levels import encode_txt_to_levels, encode_levels_to_txt
 cols, rows = 19, 15
 tile_size = 20
 resized_size = (cols * tile_size, rows * tile_size)
+batch_size = 512  # tiles por forward da ResNet (um screenshot tem 285)
 
 input_dir = os.path.join(repo_root, "data", "pictures", "screenshots")
 ref_dir = os.path.join(repo_root, "data", "pictures", "tiles", "labels")
@@ -57,21 +59,32 @@ def carregar_tiles_de_referencia(ref_dir):
                 tile_examples[label] = tile_img
     return tile_examples
 
-def classificar_tiles(image, embeddings):
+def recortar_tiles(image):
+    """Os rows * cols tiles do screenshot, linha a linha."""
     image = image.resize(resized_size, Image.NEAREST)
-    label_matrix = []
+    tiles = []
     for i in range(rows):
-        row_labels = []
         for j in range(cols):
             left = j * tile_size
             top = i * tile_size
-            right = left + tile_size
-            bottom = top + tile_size
-            tile = image.crop((left, top, right, bottom))
-            label_char = classify_by_knn(tile, embeddings)
-            row_labels.append(label_char)
-        label_matrix.append(row_labels)
-    return label_matrix
+            tiles.append(image.crop((left, top, left + tile_size, top + tile_size)))
+    return tiles
+
+def para_matriz(labels):
+    return [labels[i * cols:(i + 1) * cols] for i in range(rows)]
+
+def classificar_tiles(image, embeddings, batch_size=batch_size):
+    return para_matriz(classify_batch(recortar_tiles(image), embeddings, batch_size))
+
+def classificar_screenshots(image_paths, embeddings, batch_size=batch_size):
+    """
+    Classifica vários screenshots de uma vez: os tiles de todos formam um único
+    fluxo de lotes (um lote pode misturar screenshots) e a saída é uma matriz por imagem.
+    """
+    tiles = chain.from_iterable(recortar_tiles(Image.open(path).convert("RGB")) for path in image_paths)
+    labels = classify_batch(tiles, embeddings, batch_size)
+    per_image = rows * cols
+    return [para_matriz(labels[k:k + per_image]) for k in range(0, len(labels), per_image)]
 
 def salvar_txt(label_matrix, output_txt_path):
     with open(output_txt_path, "w") as f:
@@ -87,14 +100,10 @@ def reconstruir_imagem(label_matrix, tile_examples, output_path):
                 reconstructed.paste(tile, (j * tile_size, i * tile_size))
     reconstructed.save(output_path)
 
-def processar_imagem(image_file, idx, embeddings, tile_examples):
-    input_path = os.path.join(input_dir, image_file)
+def processar_imagem(image_file, idx, label_matrix, tile_examples):
     output_txt_path = os.path.join(output_txt_dir, mapping_name_txt[image_file])
     output_jpg_path = os.path.join(rebuild_dir, mapping_name_jpg[image_file])
 
-    image = Image.open(input_path).convert("RGB")
-    label_matrix = classificar_tiles(image, embeddings)
-    
     salvar_txt(label_matrix, output_txt_path)
     print(f"[✓] {image_file} → {output_txt_path}")
     
@@ -106,11 +115,15 @@ def processar_imagem(image_file, idx, embeddings, tile_examples):
 
 def main():
     print("[INFO] Carregando embeddings de referência...")
-    embeddings = load_all_embeddings_from_folders(ref_dir)
+    embeddings = load_all_embeddings_from_folders(ref_dir, batch_size)
     tile_examples = carregar_tiles_de_referencia(ref_dir)
 
-    for idx, image_file in enumerate(image_files):
-        processar_imagem(image_file, idx, embeddings, tile_examples)
+    print(f"[INFO] Classificando {len(image_files)} screenshots em lotes de {batch_size} tiles...")
+    input_paths = [os.path.join(input_dir, image_file) for image_file in image_files]
+    label_matrices = classificar_screenshots(input_paths, embeddings, batch_size)
+
+    for idx, (image_file, label_matrix) in enumerate(zip(image_files, label_matrices)):
+        processar_imagem(image_file, idx, label_matrix, tile_examples)
 
 if __name__ == "__main__":
     main()
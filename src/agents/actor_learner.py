@@ -0,0 +1,171 @@
+# src/agents/actor_learner.py
+#
+# Treino assíncrono: processos atores rodam VectorThinIceEnv com uma cópia da
+# CnnQNet sincronizada periodicamente e escrevem as transições em anéis de
+# memória compartilhada lidos pelo aprendiz, que treina sem esperar pelos
+# ambientes.
+
+import multiprocessing as mp
+import time
+
+import numpy as np
+import torch
+
+from src.agents.dqn_agent import DQNAgent
+from src.agents.shared_ring import SharedTransitionRing
+from src.batch_game import SUCCESS
+from src.learning.vector_thin_ice_env import VectorThinIceEnv
+
+
+def actor_epsilons(num_actors, base=0.4, alpha=7.0):
+    """Epsilon fixo por ator, de `base` a base**(1+alpha) (esquema do Ape-X)."""
+    if num_actors == 1:
+        return [base]
+    return [base ** (1 + alpha * i / (num_actors - 1)) for i in range(num_actors)]
+
+
+def _publish(shared_weights, net, lock, version):
+    with lock:
+        for name, tensor in net.state_dict().items():
+            shared_weights[name].copy_(tensor)
+        version.value += 1
+
+
+def _actor_loop(actor_id, config, shared_weights, lock, version, ring, successes, stop):
+    torch.set_num_threads(1)
+    np.random.seed(config["seed"] + actor_id)
+
+    env = VectorThinIceEnv(
+        config["envs_per_actor"],
+        level_folder=config["level_folder"],
+        max_steps=config["max_steps"],
+    )
+    # Agente só para act_batch: buffer mínimo, epsilon constante
+    agent = DQNAgent(env.obs_shape, 4, device="cpu", buffer_size=1)
+    agent.epsilon = agent.epsilon_min = config["epsilons"][actor_id]
+    agent.policy_net.eval()
+
+    env_ids = actor_id * config["envs_per_actor"] + np.arange(config["envs_per_actor"])
+    local_version = -1
+    obs, _ = env.reset()
+    while not stop.is_set():
+        if version.value != local_version:
+            with lock:
+                agent.policy_net.load_state_dict(shared_weights)
+                local_version = version.value
+
+        actions = agent.act_batch(obs, env.action_masks())
+        next_obs, rewards, terminated, truncated, infos = env.step(actions)
+        s_next = next_obs
+        if "final_observation" in infos:
+            s_next = np.where((terminated | truncated)[:, None, None, None], infos["final_observation"], next_obs)
+        if not ring.push(obs, actions, rewards, s_next, terminated, truncated, env.action_masks(), env_ids, stop=stop):
+            break  # anel cheio e treino encerrado
+        done_levels = int(np.count_nonzero(infos["result"] == SUCCESS))
+        if done_levels:
+            with successes.get_lock():
+                successes.value += done_levels
+        obs = next_obs
+    ring.close()
+
+
+class AsyncTrainer:
+    """Aprendiz que consome transições de `num_actors` processos atores.
+
+    Cada ator roda `envs_per_actor` ambientes em um VectorThinIceEnv e
+    escolhe ações com `act_batch` sobre uma cópia da rede; os pesos ficam em
+    tensores de memória compartilhada, republicados a cada `sync_every`
+    atualizações. Cada ator escreve num SharedTransitionRing próprio (com
+    espaço para `ring_steps` passos) e o aprendiz drena os anéis com
+    `DQNAgent.consume`, um `env_id` por ambiente, preservando o
+    reaproveitamento de quadros e as filas de n passos.
+    """
+
+    def __init__(
+        self,
+        agent,
+        num_actors=4,
+        envs_per_actor=8,
+        level_folder="original_game",
+        max_steps=400,
+        ring_steps=256,
+        sync_every=200,
+        min_buffer_size=1000,
+        updates_per_block=None,
+        seed=0,
+    ):
+        self.agent = agent
+        self.num_actors = num_actors
+        self.envs_per_actor = envs_per_actor
+        self.sync_every = sync_every
+        self.min_buffer_size = min_buffer_size
+        # Padrão: uma atualização a cada `batch_size` transições recebidas
+        self.ring_steps = ring_steps
+        self.updates_per_block = updates_per_block
+        self.config = {
+            "envs_per_actor": envs_per_actor,
+            "level_folder": level_folder,
+            "max_steps": max_steps,
+            "epsilons": actor_epsilons(num_actors),
+            "seed": seed,
+        }
+        self.stats = {"transitions": 0, "updates": 0, "successes": 0}
+
+    def _ingest(self, rings):
+        count = sum(self.agent.consume(ring) for ring in rings)
+        self.agent.step_count += count  # o aprendiz não age: conta os passos dos atores
+        self.stats["transitions"] += count
+        return count
+
+    def run(self, total_updates, log_every=1000):
+        ctx = mp.get_context("spawn")
+        net = self.agent.policy_net
+        shared_weights = {name: tensor.detach().cpu().clone().share_memory_()
+                          for name, tensor in net.state_dict().items()}
+        lock = ctx.Lock()
+        version = ctx.Value("i", 0)
+        successes = ctx.Value("q", 0)
+        stop = ctx.Event()
+        rings = [SharedTransitionRing(self.ring_steps * self.envs_per_actor, self.agent.state_shape)
+                 for _ in range(self.num_actors)]
+
+        actors = [
+            ctx.Process(target=_actor_loop, daemon=True,
+                        args=(i, self.config, shared_weights, lock, version, rings[i], successes, stop))
+            for i in range(self.num_actors)
+        ]
+        for actor in actors:
+            actor.start()
+
+        start = time.perf_counter()
+        try:
+            while self.stats["updates"] < total_updates:
+                received = self._ingest(rings)
+                if len(self.agent.buffer) < self.min_buffer_size:
+                    if not received:
+                        time.sleep(1e-3)
+                    continue
+                # Padrão: uma atualização a cada `batch_size` transições recebidas (ao menos uma)
+                updates = self.updates_per_block or max(1, received // self.agent.batch_size)
+                for _ in range(updates):
+                    self.agent.update()
+                    self.stats["updates"] += 1
+                    if self.stats["updates"] % self.sync_every == 0:
+                        _publish(shared_weights, net, lock, version)
+                    if log_every and self.stats["updates"] % log_every == 0:
+                        elapsed = time.perf_counter() - start
+                        self.stats["successes"] = successes.value
+                        print(f"[async] {self.stats['updates']} atualizações | "
+                              f"{self.stats['transitions'] / elapsed:.0f} transições/s | "
+                              f"{self.stats['successes']} fases concluídas")
+        finally:
+            stop.set()
+            for actor in actors:
+                actor.join(timeout=5)
+                if actor.is_alive():
+                    actor.terminate()
+            for ring in rings:
+                ring.close()
+                ring.unlink()
+            self.stats["successes"] = successes.value
+        return self.stats
@@ -1,38 +1,19 @@
 # src/agents/dqn_agent.py
 
 import random
-import numpy as np
 from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
-from src.agents.networks import CnnQNet
-
-
-class ReplayBuffer:
-    def __init__(self, capacity):
-        self.buffer = deque(maxlen=capacity)
-
-    def add(self, s, a, r, s_next, done):
-        self.buffer.append((s, a, r, s_next, done))
-
-    def sample(self, batch_size):
-        batch = random.sample(self.buffer, batch_size)
-        s, a, r, s_next, d = map(np.array, zip(*batch))
-        return (
-            torch.tensor(s, dtype=torch.float32),
-            torch.tensor(a, dtype=torch.int64),
-            torch.tensor(r, dtype=torch.float32),
-            torch.tensor(s_next, dtype=torch.float32),
-            torch.tensor(d, dtype=torch.float32)
-        )
-
-    def __len__(self):
-        return len(self.buffer)
+from src.agents.networks import CnnQNet, inference_module
+from src.agents.numpy_policy import export_cnn_qnet
+from src.agents.replay_buffer import PrioritizedReplayBuffer, ReplayBuffer
 
-    def clear(self):  # ← ainda disponível, se quiser limpar tudo manualmente
-        self.buffer.clear()
 
 class DQNAgent:
     def __init__(
@@ -48,9 +29,19 @@ class DQNAgent:
         epsilon_start=1.0,
         epsilon_end=0.05,
         epsilon_decay=50_000,
-        double_dqn=True
+        double_dqn=True,
+        packed_buffer=False,
+        prioritized=False,
+        per_alpha=0.6,
+        per_beta_start=0.4,
+        per_beta_steps=100_000,
+        n_step=1,
+        bf16=False,
+        channels_last=False,
+        compile_mode=None
     ):
         self.device = device
+        self.state_shape = tuple(state_shape)
         self.n_actions = n_actions
         self.gamma = gamma
         self.batch_size = batch_size
@@ -62,21 +53,68 @@ class DQNAgent:
         self.target_net.load_state_dict(self.policy_net.state_dict())
         self.target_net.eval()
 
+        # Caminho rápido: autocast bf16, formato channels-last e forward
+        # compilado/traçado para act, act_batch e o alvo do update
+        self.bf16 = bf16
+        self.channels_last = channels_last
+        if channels_last:
+            self.policy_net = self.policy_net.to(memory_format=torch.channels_last)
+            self.target_net = self.target_net.to(memory_format=torch.channels_last)
+        example = self._prepare(torch.zeros(1, *state_shape))
+        self._policy_infer = inference_module(self.policy_net, compile_mode, example)
+        self._target_infer = inference_module(self.target_net, compile_mode, example)
+
         self.optimizer = optim.Adam(self.policy_net.parameters(), lr=lr)
         self.scheduler = optim.lr_scheduler.StepLR(self.optimizer, step_size=5000, gamma=0.9)
         self.loss_fn = nn.SmoothL1Loss()
 
-        self.buffer = ReplayBuffer(buffer_size)
+        # PER: beta vai de per_beta_start a 1 ao longo de per_beta_steps passos
+        self.prioritized = prioritized
+        self.per_beta_start = per_beta_start
+        self.per_beta_steps = per_beta_steps
+        if prioritized:
+            self.buffer = PrioritizedReplayBuffer(buffer_size, alpha=per_alpha, packed=packed_buffer)
+        else:
+            self.buffer = ReplayBuffer(buffer_size, packed=packed_buffer)
+
+        # Retornos de n passos: fila curta por ambiente antes de entrar no buffer
+        self.n_step = n_step
+        self._nstep_queues = {}
 
         self.epsilon = epsilon_start
         self.epsilon_min = epsilon_end
         self.epsilon_decay = epsilon_decay
         self.step_count = 0
+        self._target_synced_at = 0
+
+        # Telemetria opcional (src/agents/telemetry.py): tempo de amostragem, backward e sincronização
+        self.telemetry = None
+
+    def _prepare(self, x):
+        """Tensor de observações (qualquer dtype) -> float no dispositivo e no formato da rede."""
+        x = x.to(self.device).float()
+        if self.channels_last:
+            x = x.contiguous(memory_format=torch.channels_last)
+        return x
+
+    def _autocast(self):
+        return torch.autocast(torch.device(self.device).type, dtype=torch.bfloat16, enabled=self.bf16)
+
+    def _infer(self, net, x):
+        """Q-values sem gradiente, em float32."""
+        with torch.no_grad(), self._autocast():
+            return net(self._prepare(x)).float()
+
+    def _phase(self, name):
+        return nullcontext() if self.telemetry is None else self.telemetry.phase(name)
+
+    def _eps_threshold(self):
+        return self.epsilon_min + (self.epsilon - self.epsilon_min) * \
+               np.exp(-1. * self.step_count / self.epsilon_decay)
 
     def act(self, state, action_mask=None):
         self.step_count += 1
-        eps_threshold = self.epsilon_min + (self.epsilon - self.epsilon_min) * \
-                        np.exp(-1. * self.step_count / self.epsilon_decay)
+        eps_threshold = self._eps_threshold()
 
         if action_mask is None:
             action_mask = np.ones(self.n_actions, dtype=bool)
@@ -88,53 +126,147 @@ class DQNAgent:
         if random.random() < eps_threshold:
             return np.random.choice(valid_actions)
 
-        state_tensor = torch.tensor(state, dtype=torch.float32).unsqueeze(0).to(self.device)
-        with torch.no_grad():
-            q_values = self.policy_net(state_tensor)[0].cpu().numpy()
+        q_values = self._infer(self._policy_infer, torch.as_tensor(state).unsqueeze(0))[0].cpu().numpy()
 
         if action_mask is not None:
             q_values[~action_mask] = -np.inf
         return int(np.argmax(q_values))
 
-    def remember(self, s, a, r, s_next, done):
-        self.buffer.add(s, a, r, s_next, done)
+    def act_batch(self, states, masks=None):
+        """Ações epsilon-greedy para N ambientes com um único forward.
+
+        `states` tem forma (N, C, H, W) e `masks` (N, n_actions), booleana.
+        Cada ambiente conta como um passo no decaimento de epsilon. Linhas sem
+        ação válida recebem uma ação qualquer, como em `act`.
+        """
+        states = np.asarray(states)
+        n = len(states)
+        self.step_count += n
+        eps_threshold = self._eps_threshold()
+
+        if masks is None:
+            masks = np.ones((n, self.n_actions), dtype=bool)
+        masks = np.asarray(masks, dtype=bool)
+        no_valid = ~masks.any(axis=1)
+        masks = masks | no_valid[:, None]
+
+        # Exploração: sorteio uniforme entre as ações válidas de cada linha
+        scores = np.where(masks, np.random.random(masks.shape), -1.0)
+        actions = scores.argmax(axis=1)
+
+        greedy = ~no_valid & (np.random.random(n) >= eps_threshold)
+        if greedy.any():
+            q_values = self._infer(self._policy_infer, torch.as_tensor(states[greedy])).cpu().numpy()
+            q_values[~masks[greedy]] = -np.inf
+            actions[greedy] = q_values.argmax(axis=1)
+        return actions
+
+    def remember(self, s, a, r, s_next, done, truncated=False, env_id=0):
+        """Guarda a transição; com n_step > 1 acumula retornos descontados por ambiente.
+
+        `done` marca fim real do episódio (sem bootstrap); `truncated` só
+        esvazia a fila, e as transições parciais fazem bootstrap de `s_next`
+        com gamma**k, k = passos efetivamente acumulados.
+        """
+        if self.n_step == 1:
+            self.buffer.add(s, a, r, s_next, done, env_id=env_id)
+            return
+
+        # A fila guarda ids de quadro: o s de cada passo é o s_next do anterior,
+        # então cada passo grava um único quadro no buffer
+        state_id = self.buffer.store_frame(s, env_id)
+        next_id = self.buffer.store_frame(s_next, env_id)
+        queue = self._nstep_queues.setdefault(env_id, deque())
+        queue.append((state_id, a, r))
+        if len(queue) == self.n_step:
+            self._push_nstep(queue, next_id, done)
+            queue.popleft()
+        if done or truncated:
+            while queue:
+                self._push_nstep(queue, next_id, done)
+                queue.popleft()
+
+    def consume(self, source, max_items=None):
+        """Drena transições de uma fonte (ex.: SharedTransitionRing) para o buffer."""
+        s, a, r, s_next, terminated, truncated, _, env_ids = source.pop(max_items)
+        for i in range(len(a)):
+            self.remember(s[i], a[i], r[i], s_next[i], terminated[i],
+                          truncated=truncated[i], env_id=int(env_ids[i]))
+        return len(a)
+
+    def _push_nstep(self, queue, next_id, done):
+        ret = 0.0
+        for _, _, r in reversed(queue):
+            ret = r + self.gamma * ret
+        state_id, a, _ = queue[0]
+        self.buffer.add_ids(state_id, a, ret, next_id, done, steps=len(queue))
 
     def update(self):
         if len(self.buffer) < self.batch_size:
             return
 
-        s, a, r, s_next, d = self.buffer.sample(self.batch_size)
+        with self._phase("sample"):
+            if self.prioritized:
+                beta = min(1.0, self.per_beta_start + (1.0 - self.per_beta_start) * self.step_count / self.per_beta_steps)
+                idx, weights = self.buffer.sample_prioritized(self.batch_size, beta)
+            else:
+                idx = self.buffer.sample_indices(self.batch_size)
+            s, a, r, s_next, d = self.buffer.gather(idx)
 
-        s = s.to(self.device)
-        s_next = s_next.to(self.device)
-        a = a.to(self.device)
-        r = r.to(self.device)
-        d = d.to(self.device)
+            # Observações chegam no dtype do buffer (uint8): convertidas já no dispositivo
+            s = self._prepare(s)
+            s_next = self._prepare(s_next)
+            a = a.to(self.device)
+            r = r.to(self.device)
+            d = d.to(self.device)
 
-        q_values = self.policy_net(s).gather(1, a.unsqueeze(1)).squeeze(1)
+        with self._phase("forward"):
+            with self._autocast():
+                q_values = self.policy_net(s).gather(1, a.unsqueeze(1)).squeeze(1).float()
 
-        with torch.no_grad():
-            if self.double_dqn:
-                a_max = self.policy_net(s_next).argmax(dim=1, keepdim=True)
-                q_target_next = self.target_net(s_next).gather(1, a_max).squeeze(1)
-            else:
-                q_target_next = self.target_net(s_next).max(1)[0]
+            with torch.no_grad():
+                if self.double_dqn:
+                    a_max = self._infer(self._policy_infer, s_next).argmax(dim=1, keepdim=True)
+                    q_target_next = self._infer(self._target_infer, s_next).gather(1, a_max).squeeze(1)
+                else:
+                    q_target_next = self._infer(self._target_infer, s_next).max(1)[0]
 
-            q_target = r + self.gamma * q_target_next * (1 - d)
+                if self.n_step == 1:
+                    discount = self.gamma
+                else:
+                    steps = torch.from_numpy(self.buffer.steps[idx].astype(np.float32)).to(self.device)
+                    discount = self.gamma ** steps
+                q_target = r + discount * q_target_next * (1 - d)
 
-        loss = self.loss_fn(q_values, q_target)
+            if self.prioritized:
+                # Pesos de importância corrigem o viés da amostragem; |erro TD| vira a nova prioridade
+                elementwise = F.smooth_l1_loss(q_values, q_target, reduction="none")
+                loss = (torch.from_numpy(weights).to(self.device) * elementwise).mean()
+                self.buffer.update_priorities(idx, (q_target - q_values).detach().cpu().numpy())
+            else:
+                loss = self.loss_fn(q_values, q_target)
 
-        self.optimizer.zero_grad()
-        loss.backward()
-        self.optimizer.step()
-        self.scheduler.step()
+        with self._phase("backward"):
+            self.optimizer.zero_grad()
+            loss.backward()
+            self.optimizer.step()
+            self.scheduler.step()
 
-        if self.step_count % self.update_target_every == 0:
-            self.target_net.load_state_dict(self.policy_net.state_dict())
+        # act_batch avança step_count de N em N: sincroniza ao cruzar o intervalo
+        if self.step_count - self._target_synced_at >= self.update_target_every:
+            with self._phase("target_sync"):
+                self.target_net.load_state_dict(self.policy_net.state_dict())
+            self._target_synced_at = self.step_count
+        if self.telemetry is not None:
+            self.telemetry.count("updates")
 
     def save(self, path):
         torch.save(self.policy_net.state_dict(), path)
 
+    def export(self, path):
+        """Exporta a policy_net para execução só com NumPy (ver PolicyRunner)."""
+        export_cnn_qnet(self.policy_net, path, self.state_shape)
+
     def load(self, path):
         self.policy_net.load_state_dict(torch.load(path, map_location=self.device))
         self.target_net.load_state_dict(self.policy_net.state_dict())
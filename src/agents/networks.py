@@ -20,4 +20,28 @@ class CnnQNet(nn.Module):
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         x = self.features(x)
-        return self.classifier(x)
\ No newline at end of file
+        return self.classifier(x)
+
+def inference_module(net: nn.Module, mode=None, example: torch.Tensor = None):
+    """Versão de `net` para forwards sem gradiente (act e alvo do DQN).
+
+    mode=None devolve a própria rede; "trace" gera um módulo TorchScript
+    (traçado em modo eval, sem dropout) e "compile" usa torch.compile. Os
+    dois compartilham os parâmetros de `net`: atualizações e
+    load_state_dict continuam valendo sem recompilar.
+    """
+    if mode is None:
+        return net
+    if mode == "compile":
+        return torch.compile(net, dynamic=True)
+    if mode == "trace":
+        import warnings
+
+        was_training = net.training
+        net.eval()
+        with torch.no_grad(), warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)  # torch.jit é marcado como obsoleto
+            traced = torch.jit.trace(net, example)
+        net.train(was_training)
+        return traced
+    raise ValueError(f"Modo de inferência desconhecido: {mode}")
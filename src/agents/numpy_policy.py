@@ -0,0 +1,185 @@
+# src/agents/numpy_policy.py
+#
+# Execução de políticas treinadas só com NumPy. A rede (CnnQNet do DQN ou a
+# MlpPolicy do MaskablePPO) é exportada como uma lista de camadas em um .npz;
+# PolicyRunner refaz o forward em lote sem importar torch, para workers de
+# avaliação com inicialização rápida e pouca memória.
+
+import json
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+# ---------- Exportação (recebe módulos torch, mas não importa torch) ----------
+
+def _layer_specs(modules, arrays):
+    """Percorre os módulos e devolve a lista de camadas; pesos vão para `arrays`."""
+    specs = []
+    for module in modules:
+        kind = type(module).__name__
+        if kind == "Sequential":
+            specs += _layer_specs(list(module), arrays)
+        elif kind in ("Conv2d", "Linear"):
+            key = f"layer{len(arrays) // 2}"
+            arrays[f"{key}_w"] = module.weight.detach().cpu().float().numpy()
+            arrays[f"{key}_b"] = module.bias.detach().cpu().float().numpy()
+            spec = {"type": kind.lower(), "key": key}
+            if kind == "Conv2d":
+                if module.stride != (1, 1) or module.dilation != (1, 1) or module.groups != 1:
+                    raise ValueError("Só convoluções com stride 1, sem dilatação e sem grupos")
+                spec["padding"] = list(module.padding)
+            specs.append(spec)
+        elif kind in ("ReLU", "Tanh"):
+            specs.append({"type": kind.lower()})
+        elif kind in ("Flatten", "FlattenExtractor"):
+            specs.append({"type": "flatten"})
+        elif kind == "AdaptiveAvgPool2d":
+            size = module.output_size
+            specs.append({"type": "adaptiveavgpool2d",
+                          "output_size": list(size) if isinstance(size, tuple) else [size, size]})
+        elif kind == "Dropout":
+            continue  # inferência: dropout é identidade
+        else:
+            raise ValueError(f"Camada sem equivalente em NumPy: {kind}")
+    return specs
+
+
+def export_policy(modules, path, obs_shape, kind="q_values"):
+    """Grava `modules` (aplicados em sequência) como política NumPy em `path` (.npz)."""
+    arrays = {}
+    specs = _layer_specs(modules, arrays)
+    meta = {"version": FORMAT_VERSION, "obs_shape": list(obs_shape), "kind": kind, "layers": specs}
+    np.savez(path, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8), **arrays)
+
+
+def export_cnn_qnet(net, path, obs_shape):
+    """CnnQNet (rede do DQNAgent) -> .npz."""
+    export_policy([net.features, net.classifier], path, obs_shape, kind="q_values")
+
+
+def export_maskable_ppo(model, path):
+    """Ator de um (Maskable)PPO com MlpPolicy -> .npz com os logits das ações."""
+    policy = model.policy
+    export_policy([policy.pi_features_extractor, policy.mlp_extractor.policy_net, policy.action_net],
+                  path, model.observation_space.shape, kind="logits")
+
+
+# ---------- Execução ----------
+
+def _adaptive_pool_matrix(size, out):
+    """Matriz (out, size) que reproduz AdaptiveAvgPool ao longo de um eixo."""
+    matrix = np.zeros((out, size), dtype=np.float32)
+    for i in range(out):
+        start, end = (i * size) // out, -((-(i + 1) * size) // out)
+        matrix[i, start:end] = 1.0 / (end - start)
+    return matrix
+
+
+class PolicyRunner:
+    """Forward em lote de uma política exportada, só com NumPy.
+
+    Internamente as ativações ficam em NHWC: cada convolução vira a soma de
+    kh*kw multiplicações de matrizes sobre fatias deslocadas da entrada
+    (sem materializar as janelas) e o `flatten` volta
+    para a ordem CHW do PyTorch, então a saída coincide com a da rede
+    original em modo eval.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode())
+            if meta["version"] != FORMAT_VERSION:
+                raise ValueError(f"{path}: versão de formato {meta['version']} não suportada")
+            self.obs_shape = tuple(meta["obs_shape"])
+            self.kind = meta["kind"]
+            self.layers = []
+            for spec in meta["layers"]:
+                self.layers.append(self._build(spec, data))
+
+    def _build(self, spec, data):
+        kind = spec["type"]
+        if kind == "conv2d":
+            # (out, C, kh, kw) -> (kh, kw, C, out): uma matriz C x out por deslocamento do kernel
+            w = data[spec["key"] + "_w"].transpose(2, 3, 1, 0).copy()
+            return kind, (w, data[spec["key"] + "_b"], tuple(spec["padding"]))
+        if kind == "linear":
+            return kind, (data[spec["key"] + "_w"].T.copy(), data[spec["key"] + "_b"])
+        if kind == "adaptiveavgpool2d":
+            return kind, tuple(spec["output_size"])
+        return kind, None
+
+    def forward(self, obs):
+        """Saída da rede (Q-values ou logits) para um lote (N, *obs_shape)."""
+        x = np.asarray(obs, dtype=np.float32)
+        nhwc = False
+        if x.ndim == 4:
+            x = x.transpose(0, 2, 3, 1)  # NCHW -> NHWC
+            nhwc = True
+        for kind, params in self.layers:
+            if kind == "conv2d":
+                w, b, (ph, pw) = params
+                kh, kw = w.shape[:2]
+                padded = np.pad(x, ((0, 0), (ph, ph), (pw, pw), (0, 0)))
+                out_h, out_w = padded.shape[1] - kh + 1, padded.shape[2] - kw + 1
+                x = np.broadcast_to(b, (len(x), out_h, out_w, len(b))).copy()
+                for i in range(kh):
+                    for j in range(kw):
+                        x += padded[:, i:i + out_h, j:j + out_w, :] @ w[i, j]
+            elif kind == "relu":
+                x = np.maximum(x, 0)
+            elif kind == "tanh":
+                x = np.tanh(x)
+            elif kind == "adaptiveavgpool2d":
+                ph_m = _adaptive_pool_matrix(x.shape[1], params[0])
+                pw_m = _adaptive_pool_matrix(x.shape[2], params[1])
+                x = np.einsum("ih,nhwc,jw->nijc", ph_m, x, pw_m, optimize=True)
+            elif kind == "flatten":
+                if nhwc:
+                    x = x.transpose(0, 3, 1, 2)  # ordem CHW do PyTorch
+                    nhwc = False
+                x = x.reshape(len(x), -1)
+            elif kind == "linear":
+                w, b = params
+                x = x @ w + b
+        return x
+
+    def act(self, obs, masks=None):
+        """Ações gulosas (maior Q/logit entre as válidas); aceita uma observação ou um lote."""
+        obs = np.asarray(obs)
+        single = obs.shape == self.obs_shape
+        out = self.forward(obs[None] if single else obs)
+        if masks is not None:
+            masks = np.asarray(masks, dtype=bool).reshape(out.shape)
+            out = np.where(masks | ~masks.any(axis=1, keepdims=True), out, -np.inf)
+        actions = out.argmax(axis=1)
+        return int(actions[0]) if single else actions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exporta uma política treinada para execução só com NumPy")
+    sub = parser.add_subparsers(dest="command", required=True)
+    dqn = sub.add_parser("dqn", help="pesos de CnnQNet salvos por DQNAgent.save (.pth) -> .npz")
+    dqn.add_argument("model")
+    dqn.add_argument("output")
+    ppo = sub.add_parser("ppo", help="MaskablePPO salvo (.zip) -> .npz")
+    ppo.add_argument("model")
+    ppo.add_argument("output")
+    args = parser.parse_args()
+
+    if args.command == "dqn":
+        import torch
+        from src.agents.networks import CnnQNet
+        from src.learning.observation import OBS_SHAPE
+
+        net = CnnQNet(OBS_SHAPE[0], 4)
+        net.load_state_dict(torch.load(args.model, map_location="cpu"))
+        export_cnn_qnet(net, args.output, OBS_SHAPE)
+    else:
+        from sb3_contrib import MaskablePPO
+
+        export_maskable_ppo(MaskablePPO.load(args.model, device="cpu"), args.output)
+    print(f"[✓] Política exportada para {args.output}")
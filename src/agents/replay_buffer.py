@@ -0,0 +1,315 @@
+# src/agents/replay_buffer.py
+
+import numpy as np
+import torch
+
+
+class ReplayBuffer:
+    """Buffer circular de transições sobre arrays NumPy pré-alocados.
+
+    Cada observação é guardada uma única vez num anel de quadros (`frames`) e
+    a transição guarda só os índices do estado e do próximo estado. Quando o
+    `s` de uma transição é o `s_next` da anterior do mesmo ambiente
+    (`env_id`), o quadro é reaproveitado: um episódio contínuo custa um quadro
+    por passo. O anel de quadros tem `frame_capacity` posições (padrão 1,25x
+    a capacidade, folga para inícios de episódio); transições cujos quadros já
+    foram sobrescritos deixam o buffer.
+
+    `sample()` sorteia índices de forma vetorizada e devolve tensores; as
+    observações saem no dtype armazenado (uint8 para ThinIceEnv) e a
+    conversão para float fica para o dispositivo. Com `pin_memory` (padrão se
+    houver CUDA) os tensores vêm de áreas fixas em memória paginada travada,
+    reaproveitadas a cada chamada: valem até o próximo `sample()`.
+
+    Com `packed=True` as observações (que precisam ser binárias, como os
+    planos one-hot de ThinIceEnv) são guardadas com np.packbits: 1 bit por
+    célula de cada plano, 8x menos memória, e desempacotadas no `sample()`.
+    """
+
+    def __init__(self, capacity, frame_capacity=None, pin_memory=None, packed=False):
+        self.capacity = capacity
+        self.frame_capacity = frame_capacity or capacity + capacity // 4 + 1
+        self.pin_memory = torch.cuda.is_available() if pin_memory is None else pin_memory
+        self.packed = packed
+
+        self.frames = None  # alocado na primeira transição, com o formato/dtype da observação
+        self.obs_shape = None
+        self.obs_dtype = None
+        self.state_ids = np.zeros(capacity, dtype=np.int64)  # id global do quadro de s
+        self.next_ids = np.zeros(capacity, dtype=np.int64)   # id global do quadro de s_next
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.steps = np.ones(capacity, dtype=np.int32)      # passos cobertos (retornos de n passos)
+
+        self._added = 0           # transições já inseridas (id global)
+        self._first = 0           # id global da transição válida mais antiga
+        self._frames_written = 0  # quadros já escritos (id global)
+        self._last_next = {}      # env_id -> id global do último s_next
+        self._staging = None
+
+    # ---------- Inserção ----------
+
+    def _allocate(self, obs):
+        self.obs_shape, self.obs_dtype = obs.shape, obs.dtype
+        if self.packed:
+            if obs.dtype != np.uint8 and obs.dtype != np.bool_:
+                raise ValueError(f"packed=True exige observações binárias uint8/bool, não {obs.dtype}")
+            row = np.packbits(obs.ravel()).shape
+            self.obs_dtype = np.dtype(np.uint8)
+        else:
+            row = obs.shape
+        self.frames = np.zeros((self.frame_capacity, *row), dtype=np.uint8 if self.packed else obs.dtype)
+
+    def _encode(self, obs):
+        if not self.packed:
+            return obs
+        if obs.max(initial=0) > 1:
+            raise ValueError("packed=True exige observações com valores 0/1")
+        return np.packbits(obs.ravel())
+
+    def _decode(self, rows, out=None):
+        """Quadros -> observações (N, *obs_shape); desempacota se `packed`."""
+        if not self.packed:
+            return rows
+        bits = np.unpackbits(rows, axis=1, count=int(np.prod(self.obs_shape)))
+        obs = bits.reshape(len(rows), *self.obs_shape)
+        if out is None:
+            return obs
+        out[...] = obs
+
+    def _write_frame(self, obs) -> int:
+        frame_id = self._frames_written
+        self.frames[frame_id % self.frame_capacity] = obs
+        self._frames_written += 1
+        return frame_id
+
+    def _oldest_frame(self) -> int:
+        return self._frames_written - self.frame_capacity
+
+    def store_frame(self, obs, env_id=0) -> int:
+        """Grava (ou reaproveita) o quadro de `obs` e devolve seu id global.
+
+        Reaproveita o último quadro gravado para `env_id` se for igual a `obs`.
+        Serve para quem monta as transições por ids (`add_ids`), como os
+        retornos de n passos, em que `s` é o `s_next` de n-1 passos antes.
+        """
+        obs = np.asarray(obs)
+        if self.frames is None:
+            self._allocate(obs)
+        obs = self._encode(obs)
+        last = self._last_next.get(env_id)
+        if last is not None and last > self._oldest_frame() and np.array_equal(self.frames[last % self.frame_capacity], obs):
+            frame_id = last
+        else:
+            frame_id = self._write_frame(obs)
+        self._last_next[env_id] = frame_id
+        return frame_id
+
+    def add(self, s, a, r, s_next, done, env_id=0, steps=1):
+        s = np.asarray(s)
+        if self.frames is None:
+            self._allocate(s)
+        s = self._encode(s)
+
+        last = self._last_next.get(env_id)
+        # Folga de um quadro: escrever s_next não pode sobrescrever o s reaproveitado
+        if last is not None and last > self._oldest_frame() and np.array_equal(self.frames[last % self.frame_capacity], s):
+            state_id = last
+        else:
+            state_id = self._write_frame(s)
+        next_id = self._write_frame(self._encode(np.asarray(s_next)))
+        self._last_next[env_id] = next_id
+        return self.add_ids(state_id, a, r, next_id, done, steps)
+
+    def add_ids(self, state_id, a, r, next_id, done, steps=1):
+        """Insere uma transição cujos quadros já estão no anel (ids de `store_frame`)."""
+        slot = self._added % self.capacity
+        self.state_ids[slot] = state_id
+        self.next_ids[slot] = next_id
+        self.actions[slot] = a
+        self.rewards[slot] = r
+        self.dones[slot] = done
+        self.steps[slot] = steps
+        self._added += 1
+
+        # Despeja as transições mais antigas: fora da capacidade ou com quadros sobrescritos
+        self._first = max(self._first, self._added - self.capacity)
+        oldest = self._oldest_frame()
+        while self._first < self._added and self.state_ids[self._first % self.capacity] < oldest:
+            self._first += 1
+        return slot
+
+    # ---------- Amostragem ----------
+
+    def sample_indices(self, batch_size):
+        """Índices (posições no anel) de `batch_size` transições válidas, sorteadas com reposição."""
+        size = len(self)
+        idx = (self._first + np.random.randint(0, size, size=batch_size)) % self.capacity
+        # Com vários ambientes intercalados os quadros reaproveitados não seguem a ordem
+        # de inserção: uma transição ainda na janela pode ter perdido o quadro de s
+        stale = self.state_ids[idx] < self._oldest_frame()
+        while stale.any():
+            idx[stale] = (self._first + np.random.randint(0, size, size=int(stale.sum()))) % self.capacity
+            stale = self.state_ids[idx] < self._oldest_frame()
+        return idx
+
+    def _staging_arrays(self, batch_size):
+        """Áreas de saída reaproveitadas (em memória travada se `pin_memory`)."""
+        if self._staging is None or self._staging[0].shape[0] != batch_size:
+            shape = (batch_size, *self.obs_shape)
+            obs_dtype = torch.from_numpy(np.zeros(0, dtype=self.obs_dtype)).dtype
+            tensors = (
+                torch.empty(shape, dtype=obs_dtype),
+                torch.empty(batch_size, dtype=torch.int64),
+                torch.empty(batch_size, dtype=torch.float32),
+                torch.empty(shape, dtype=obs_dtype),
+                torch.empty(batch_size, dtype=torch.float32),
+            )
+            self._staging = tuple(t.pin_memory() for t in tensors)
+        return self._staging
+
+    def gather(self, idx):
+        """Transições nas posições `idx` como tensores (s, a, r, s_next, done)."""
+        state_frames = self.state_ids[idx] % self.frame_capacity
+        next_frames = self.next_ids[idx] % self.frame_capacity
+        if not self.pin_memory:
+            return (
+                torch.from_numpy(self._decode(self.frames[state_frames])),
+                torch.from_numpy(self.actions[idx]),
+                torch.from_numpy(self.rewards[idx]),
+                torch.from_numpy(self._decode(self.frames[next_frames])),
+                torch.from_numpy(self.dones[idx]),
+            )
+
+        s, a, r, s_next, d = self._staging_arrays(len(idx))
+        if self.packed:
+            self._decode(self.frames[state_frames], out=s.numpy())
+            self._decode(self.frames[next_frames], out=s_next.numpy())
+        else:
+            np.take(self.frames, state_frames, axis=0, out=s.numpy())
+            np.take(self.frames, next_frames, axis=0, out=s_next.numpy())
+        np.take(self.actions, idx, out=a.numpy())
+        np.take(self.rewards, idx, out=r.numpy())
+        np.take(self.dones, idx, out=d.numpy())
+        return s, a, r, s_next, d
+
+    def sample(self, batch_size):
+        return self.gather(self.sample_indices(batch_size))
+
+    def nbytes(self) -> int:
+        """Memória ocupada pelos arrays do buffer (quadros + campos por transição)."""
+        arrays = (self.state_ids, self.next_ids, self.actions, self.rewards, self.dones, self.steps)
+        return sum(a.nbytes for a in arrays) + (0 if self.frames is None else self.frames.nbytes)
+
+    def __len__(self):
+        return self._added - self._first
+
+    def clear(self):  # ← ainda disponível, se quiser limpar tudo manualmente
+        self._first = self._added
+        self._last_next.clear()
+
+
+class SumTree:
+    """Árvore de somas em array: folhas em [size, 2*size), nó i soma 2i e 2i+1.
+
+    `find()` e `update()` são vetorizados sobre lotes e descem/sobem os
+    log2(size) níveis de uma vez para o lote inteiro; `set()` é a versão
+    escalar usada a cada inserção.
+    """
+
+    def __init__(self, capacity):
+        self.size = 1
+        while self.size < capacity:
+            self.size *= 2
+        self.depth = self.size.bit_length() - 1
+        self.tree = np.zeros(2 * self.size, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return self.tree[1]
+
+    def get(self, idx):
+        return self.tree[np.asarray(idx) + self.size]
+
+    def set(self, index, value):
+        node = index + self.size
+        tree = self.tree
+        tree[node] = value
+        node //= 2
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node //= 2
+
+    def update(self, idx, values):
+        nodes = np.asarray(idx) + self.size
+        self.tree[nodes] = values
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, prefix):
+        """Folhas cujo intervalo acumulado contém cada valor de `prefix`."""
+        prefix = np.array(prefix, dtype=np.float64)
+        nodes = np.ones(len(prefix), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            right = prefix > left_sum
+            prefix -= np.where(right, left_sum, 0.0)
+            nodes = left + right
+        return nodes - self.size
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """ReplayBuffer com amostragem proporcional à prioridade (PER).
+
+    A prioridade de cada posição do anel é |erro TD|^alpha, guardada numa
+    SumTree; transições novas entram com a maior prioridade já vista e
+    transições despejadas (ou com quadros sobrescritos) ficam com prioridade
+    zero. `sample_prioritized()` sorteia de forma estratificada e devolve os
+    pesos de importância (N * P(i))^-beta, normalizados pelo maior do lote.
+    """
+
+    def __init__(self, capacity, alpha=0.6, eps=1e-6, **kwargs):
+        super().__init__(capacity, **kwargs)
+        self.alpha = alpha
+        self.eps = eps
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def add_ids(self, state_id, a, r, next_id, done, steps=1):
+        first = self._first
+        slot = super().add_ids(state_id, a, r, next_id, done, steps)
+        for evicted in range(first, self._first):
+            self.tree.set(evicted % self.capacity, 0.0)
+        self.tree.set(slot, self.max_priority)
+        return slot
+
+    def sample_prioritized(self, batch_size, beta=0.4):
+        """(idx, pesos) de `batch_size` transições sorteadas por prioridade."""
+        segment = self.tree.total / batch_size
+        prefix = (np.arange(batch_size) + np.random.random(batch_size)) * segment
+        idx = self.tree.find(prefix)
+        # Posições sem prioridade (despejadas, ou erro numérico na borda) e
+        # transições que perderam o quadro de s são zeradas e sorteadas de novo
+        bad = (self.tree.get(idx) <= 0) | (self.state_ids[idx] < self._oldest_frame())
+        while bad.any():
+            stale = idx[bad]
+            self.tree.update(stale, np.zeros(len(stale)))
+            idx[bad] = self.tree.find(np.random.random(int(bad.sum())) * self.tree.total)
+            bad = (self.tree.get(idx) <= 0) | (self.state_ids[idx] < self._oldest_frame())
+
+        probs = self.tree.get(idx) / self.tree.total
+        weights = (len(self) * probs) ** -beta
+        return idx, (weights / weights.max()).astype(np.float32)
+
+    def update_priorities(self, idx, td_errors):
+        priorities = (np.abs(td_errors) + self.eps) ** self.alpha
+        self.tree.update(idx, priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+
+    def clear(self):
+        super().clear()
+        self.tree.tree[:] = 0.0
+        self.max_priority = 1.0
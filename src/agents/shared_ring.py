@@ -0,0 +1,129 @@
+# src/agents/shared_ring.py
+#
+# Anel de transições em memória compartilhada entre um processo produtor
+# (ator / worker de rollout) e um consumidor (aprendiz). Os campos têm forma
+# fixa e vivem num único bloco de SharedMemory: nada é serializado por passo.
+
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Índices do cabeçalho (int64): contadores globais de escrita e leitura
+_WRITE, _READ = 0, 1
+
+
+def _layout(capacity, obs_shape, n_actions):
+    """Campos do anel: (nome, dtype, forma) na ordem em que ficam no bloco."""
+    return (
+        ("header", np.int64, (8,)),
+        ("obs", np.uint8, (capacity, *obs_shape)),
+        ("next_obs", np.uint8, (capacity, *obs_shape)),
+        ("actions", np.int64, (capacity,)),
+        ("rewards", np.float32, (capacity,)),
+        ("terminated", np.bool_, (capacity,)),
+        ("truncated", np.bool_, (capacity,)),
+        ("masks", np.bool_, (capacity, n_actions)),  # máscara de ações válidas em next_obs
+        ("env_ids", np.int64, (capacity,)),
+    )
+
+
+class SharedTransitionRing:
+    """Fila circular de transições em SharedMemory, um produtor e um consumidor.
+
+    O produtor escreve as posições e só então avança o contador de escrita; o
+    consumidor lê até esse contador e avança o de leitura. Cada contador tem
+    um único escritor, então não há trava: com vários atores, use um anel por
+    ator. `push()` espera (com pausas curtas) se o anel estiver cheio, até
+    haver espaço ou o evento `stop` ser sinalizado.
+
+    O objeto pode ser passado a processos filhos (inclusive com "spawn"): o
+    filho reabre o mesmo bloco pelo nome. Quem criou o anel chama `unlink()`.
+    """
+
+    def __init__(self, capacity, obs_shape, n_actions=4, name=None):
+        self.capacity = capacity
+        self.obs_shape = tuple(obs_shape)
+        self.n_actions = n_actions
+        self._owner = name is None
+
+        fields = _layout(capacity, self.obs_shape, n_actions)
+        offsets, size = [], 0
+        for _, dtype, shape in fields:
+            offsets.append(size)
+            size += int(np.prod(shape)) * np.dtype(dtype).itemsize
+            size += -size % 8  # mantém o próximo campo alinhado
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        for (field, dtype, shape), offset in zip(fields, offsets):
+            setattr(self, field, np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset))
+        if self._owner:
+            self.header[:] = 0
+
+    def __getstate__(self):
+        return {"capacity": self.capacity, "obs_shape": self.obs_shape,
+                "n_actions": self.n_actions, "name": self.shm.name}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    # ---------- Produtor ----------
+
+    def push(self, obs, actions, rewards, next_obs, terminated, truncated, masks, env_ids, stop=None):
+        """Escreve um lote de N transições (arrays com N linhas); False se `stop` interrompeu a espera."""
+        n = len(actions)
+        if n > self.capacity:
+            raise ValueError(f"Lote de {n} transições maior que o anel ({self.capacity})")
+        header = self.header
+        while header[_WRITE] + n - header[_READ] > self.capacity:
+            # No encerramento o consumidor para de ler: sem isso o produtor esperaria para sempre
+            if stop is not None and stop.is_set():
+                return False
+            time.sleep(1e-4)
+
+        start = int(header[_WRITE]) % self.capacity
+        first = min(n, self.capacity - start)
+        for dest, src in (
+            (self.obs, obs), (self.next_obs, next_obs), (self.actions, actions),
+            (self.rewards, rewards), (self.terminated, terminated),
+            (self.truncated, truncated), (self.masks, masks), (self.env_ids, env_ids),
+        ):
+            dest[start:start + first] = src[:first]
+            dest[:n - first] = src[first:]
+        header[_WRITE] += n
+        return True
+
+    # ---------- Consumidor ----------
+
+    def __len__(self):
+        return int(self.header[_WRITE] - self.header[_READ])
+
+    def pop(self, max_items=None):
+        """Copia e remove até `max_items` transições; tupla de arrays na ordem de `push`."""
+        header = self.header
+        read = int(header[_READ])
+        n = int(header[_WRITE]) - read
+        if max_items is not None:
+            n = min(n, max_items)
+        positions = (read + np.arange(n)) % self.capacity
+        batch = tuple(
+            field[positions]
+            for field in (self.obs, self.actions, self.rewards, self.next_obs,
+                          self.terminated, self.truncated, self.masks, self.env_ids)
+        )
+        header[_READ] += n
+        return batch
+
+    # ---------- Ciclo de vida ----------
+
+    def close(self):
+        for field, _, _ in _layout(0, self.obs_shape, self.n_actions):
+            setattr(self, field, None)  # solta as vistas antes de fechar o bloco
+        self.shm.close()
+
+    def unlink(self):
+        if self._owner:
+            self.shm.unlink()
@@ -0,0 +1,61 @@
+# src/agents/telemetry.py
+#
+# Telemetria leve do laço de treino: tempo acumulado por fase e contadores,
+# fechados em um registro por rodada. Desligada, cada `phase()` custa só a
+# chamada de um nullcontext.
+
+import time
+from contextlib import contextmanager, nullcontext
+from collections import defaultdict
+
+# Fases e contadores do laço de train.py e de DQNAgent.update. Entram zerados em
+# todo registro, então as colunas são as mesmas desde a primeira rodada (mesmo
+# antes de o buffer encher e as fases de update aparecerem).
+PHASES = ("level_generation", "act", "env_step", "remember", "update",
+          "sample", "forward", "backward", "target_sync", "validation")
+COUNTERS = ("steps", "updates")
+
+
+class Telemetry:
+    """Tempo por fase (`with telemetry.phase("env_step"): ...`) e contadores por rodada."""
+
+    def __init__(self, enabled=True, phases=PHASES, counters=COUNTERS):
+        self.enabled = enabled
+        self.phases = tuple(phases)
+        self.counters = tuple(counters)
+        self._start_round()
+
+    def _start_round(self):
+        self.seconds = defaultdict(float, dict.fromkeys(self.phases, 0.0))
+        self.counts = defaultdict(int, dict.fromkeys(self.counters, 0))
+        self.round_start = time.perf_counter()
+
+    def phase(self, name):
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counts[name] += n
+
+    def end_round(self, round_id, **extra):
+        """Fecha a rodada: registro plano (fases em `<fase>_s`, taxas por segundo) e zera os acumuladores."""
+        wall = time.perf_counter() - self.round_start
+        record = {"round": round_id, "wall_s": wall, **extra}
+        # Registrados primeiro, na ordem fixa; nomes extras depois, em ordem alfabética
+        for values, known, suffix in ((self.seconds, self.phases, "_s"), (self.counts, self.counters, "")):
+            extra_names = sorted(set(values) - set(known))
+            record.update({f"{name}{suffix}": values[name] for name in (*known, *extra_names)})
+        record["steps_per_sec"] = self.counts["steps"] / wall if wall else 0.0
+        record["updates_per_sec"] = self.counts["updates"] / wall if wall else 0.0
+        self._start_round()
+        return record
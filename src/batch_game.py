@@ -0,0 +1,318 @@
+# /src/batch_game.py
+
+import numpy as np
+
+from src.levels import count_levels, load_level_template
+from src.mapping import Map, Item, BLOCKING_TILES, SOLID_TILES, GRID_HEIGHT, GRID_WIDTH
+
+# Códigos de resultado de check_progress, na mesma ordem das strings de Game
+CONTINUE = 0
+SUCCESS = 1
+NOT_SUFFICIENT = 2
+GAME_OVER = 3
+RESULT_NAMES = ("CONTINUE", "SUCCESS", "NOT_SUFFICIENT", "GAME_OVER")
+
+# Ações do ambiente: 0=cima, 1=baixo, 2=esquerda, 3=direita
+ACTION_DX = np.array([0, 0, -1, 1], dtype=np.int64)
+ACTION_DY = np.array([-1, 1, 0, 0], dtype=np.int64)
+
+# Mesma ordem de vizinhos (dr, dc) usada por Game.check_lock / check_progress
+NEIGHBOURS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class BatchGame:
+    """Simula N partidas de Thin Ice em lote sobre arrays (N, 15, 19).
+
+    Replica as regras de `Game` (movimento, blocos deslizantes, teletransporte,
+    trancas, chaves, moedas e check_progress) com operações vetorizadas. Cada
+    partida tem seu próprio nível atual dentro de `level_folder`.
+    """
+
+    def __init__(
+            self,
+            level_folder: str,
+            num_games: int,
+            perfect_score_required: bool = False,
+            loop_on_finish: bool = False,
+            level_ids=None,
+        ):
+        self.level_folder = level_folder
+        self.num_games = num_games
+        self.perfect_score_required = perfect_score_required
+        self.loop_on_finish = loop_on_finish
+
+        self._load_templates()
+
+        self.initial_level_ids = np.zeros(num_games, dtype=np.int64) if level_ids is None \
+            else np.asarray(level_ids, dtype=np.int64).copy()
+
+        n = num_games
+        self.grid = np.zeros((n, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.items = np.zeros((n, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.level_id = np.zeros(n, dtype=np.int64)
+        self.player_x = np.zeros(n, dtype=np.int64)
+        self.player_y = np.zeros(n, dtype=np.int64)
+        self.keys_obtained = np.zeros(n, dtype=np.int64)
+        self.current_tiles = np.zeros(n, dtype=np.int64)
+        self.current_points = np.zeros(n, dtype=np.int64)
+        self.points = np.zeros(n, dtype=np.int64)
+        self.solved = np.zeros(n, dtype=np.int64)
+
+        self.reset()
+
+    def _load_templates(self):
+        """Lê todos os níveis da pasta uma única vez e empilha os estados iniciais."""
+        count = max(count_levels(self.level_folder), 1)
+        self.max_level_id = count - 1
+
+        self.tpl_grid = np.zeros((count, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.tpl_items = np.zeros((count, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.tpl_start = np.zeros((count, 2), dtype=np.int64)
+        self.tpl_total_tiles = np.zeros(count, dtype=np.int64)
+        self.tpl_teleport_mask = np.zeros((count, GRID_HEIGHT, GRID_WIDTH), dtype=bool)
+        # Saída de cada teletransporte como índice achatado (y * W + x), -1 se não houver
+        self.tpl_teleport_exit = np.full((count, GRID_HEIGHT * GRID_WIDTH), -1, dtype=np.int64)
+
+        for level_id in range(count):
+            level = load_level_template(self.level_folder, level_id)
+            self.tpl_grid[level_id] = level.grid
+            self.tpl_items[level_id] = level.items
+            self.tpl_start[level_id] = level.start
+            self.tpl_total_tiles[level_id] = level.total_tiles
+            for x, y in level.teleport_cells:
+                self.tpl_teleport_mask[level_id, y, x] = True
+                ex, ey = level.teleport_exit[y, x]
+                if ex >= 0:
+                    self.tpl_teleport_exit[level_id, y * GRID_WIDTH + x] = ey * GRID_WIDTH + ex
+
+    # ---------- Carregamento ----------
+
+    def reset(self, mask=None):
+        """Reinicia as partidas selecionadas (todas por padrão) no nível inicial."""
+        mask = np.ones(self.num_games, dtype=bool) if mask is None else mask
+        self.points[mask] = 0
+        self.solved[mask] = 0
+        self.level_id[mask] = self.initial_level_ids[mask]
+        self._load_levels(mask)
+
+    def _load_levels(self, mask):
+        ids = self.level_id[mask]
+        self.grid[mask] = self.tpl_grid[ids]
+        self.items[mask] = self.tpl_items[ids]
+        self.player_x[mask] = self.tpl_start[ids, 0]
+        self.player_y[mask] = self.tpl_start[ids, 1]
+        self.current_tiles[mask] = 0
+        self.current_points[mask] = self.points[mask]
+        self.keys_obtained[mask] = 0
+
+    def load_next_level(self, mask):
+        self.current_points[mask] += self.current_tiles[mask] * 2
+        self.points[mask] = self.current_points[mask]
+        self.solved[mask] += 1
+
+        ids = self.level_id[mask]
+        last = ids >= self.max_level_id
+        self.level_id[mask] = np.where(last, 0 if self.loop_on_finish else self.max_level_id, ids + 1)
+        self._load_levels(mask)
+
+    def reload_level(self, mask):
+        self._load_levels(mask)
+
+    # ---------- Regras ----------
+
+    def _tile_at(self, games, x, y):
+        """Tile em (x, y) por partida; posições fora do grid contam como parede."""
+        inside = (x >= 0) & (x < GRID_WIDTH) & (y >= 0) & (y < GRID_HEIGHT)
+        tiles = self.grid[games, np.clip(y, 0, GRID_HEIGHT - 1), np.clip(x, 0, GRID_WIDTH - 1)]
+        return np.where(inside, tiles, Map.WALL.value), inside
+
+    def _teleport_exit(self, games, x, y):
+        flat = self.tpl_teleport_exit[self.level_id[games], y * GRID_WIDTH + x]
+        return flat % GRID_WIDTH, flat // GRID_WIDTH
+
+    def move_players(self, actions):
+        """Aplica Game.move_player às N partidas e desliza os blocos empurrados.
+
+        Retorna a máscara das partidas em que o jogador de fato se moveu.
+        """
+        games = np.arange(self.num_games)
+        actions = np.asarray(actions, dtype=np.int64)
+        dx, dy = ACTION_DX[actions], ACTION_DY[actions]
+        new_x, new_y = self.player_x + dx, self.player_y + dy
+
+        tile, inside = self._tile_at(games, new_x, new_y)
+        moved = inside & ~BLOCKING_TILES[tile]
+
+        cx, cy = np.clip(new_x, 0, GRID_WIDTH - 1), np.clip(new_y, 0, GRID_HEIGHT - 1)
+        has_block = (self.items[games, cy, cx] & Item.BLOCK) != 0
+        beyond, _ = self._tile_at(games, new_x + dx, new_y + dy)
+        moved &= ~(has_block & BLOCKING_TILES[beyond])
+        pushed = moved & has_block
+
+        # Primeiro passo do bloco acontece antes do gelo derreter (como em Game.move_player)
+        block_x, block_y = new_x.copy(), new_y.copy()
+        self._advance_blocks(pushed.copy(), block_x, block_y, dx, dy)
+
+        g = games[moved]
+        px, py = self.player_x[g], self.player_y[g]
+        current = self.grid[g, py, px]
+        self.grid[g, py, px] = np.where(
+            current == Map.THIN_ICE.value, Map.WATER.value,
+            np.where(current == Map.THICK_ICE.value, Map.THIN_ICE.value, current)
+        )
+
+        self._check_locks(g, new_x[g], new_y[g])
+
+        nx, ny = new_x[g], new_y[g]
+        on_teleport = self.grid[g, ny, nx] == Map.TELEPORT.value
+        if on_teleport.any():
+            tg = g[on_teleport]
+            ex, ey = self._teleport_exit(tg, nx[on_teleport], ny[on_teleport])
+            nx[on_teleport], ny[on_teleport] = ex, ey
+            used = self.tpl_teleport_mask[self.level_id[tg]]
+            self.grid[tg] = np.where(used, Map.TILE.value, self.grid[tg])
+
+        self.player_x[g], self.player_y[g] = nx, ny
+        self.current_points[g] += 1
+        self.current_tiles[g] += 1
+
+        coins = (self.items[g, ny, nx] & Item.COIN_BAG) != 0
+        self.current_points[g[coins]] += 100
+        self.items[g[coins], ny[coins], nx[coins]] &= ~np.uint8(Item.COIN_BAG)
+
+        keys = (self.items[g, ny, nx] & Item.KEY) != 0
+        self.keys_obtained[g[keys]] += 1
+        self.items[g[keys], ny[keys], nx[keys]] &= ~np.uint8(Item.KEY)
+
+        # Demais passos do bloco, como no laço de ThinIceEnv.step
+        sliding = pushed.copy()
+        for _ in range(GRID_HEIGHT * GRID_WIDTH):
+            if not sliding.any():
+                break
+            self._advance_blocks(sliding, block_x, block_y, dx, dy)
+
+        return moved
+
+    def _advance_blocks(self, active, block_x, block_y, dx, dy):
+        """Game.move_block vetorizado: avança um passo os blocos ativos (in-place)."""
+        if not active.any():
+            return
+        g = np.nonzero(active)[0]
+        bx, by = block_x[g], block_y[g]
+        nx, ny = bx + dx[g], by + dy[g]
+
+        tile, _ = self._tile_at(g, nx, ny)
+        free = ~BLOCKING_TILES[tile]
+        active[g[~free]] = False
+
+        g, bx, by, nx, ny = g[free], bx[free], by[free], nx[free], ny[free]
+        on_teleport = self.grid[g, ny, nx] == Map.TELEPORT.value
+        if on_teleport.any():
+            ex, ey = self._teleport_exit(g[on_teleport], nx[on_teleport], ny[on_teleport])
+            nx[on_teleport], ny[on_teleport] = ex, ey
+
+        self.items[g, by, bx] &= ~np.uint8(Item.BLOCK)
+        self.items[g, ny, nx] |= np.uint8(Item.BLOCK)
+        block_x[g], block_y[g] = nx, ny
+
+    def _check_locks(self, games, x, y):
+        for dr, dc in NEIGHBOURS:
+            nr, nc = y + dr, x + dc
+            inside = (nr >= 0) & (nr < GRID_HEIGHT) & (nc >= 0) & (nc < GRID_WIDTH)
+            g, nr, nc = games[inside], nr[inside], nc[inside]
+            opens = (self.grid[g, nr, nc] == Map.LOCK.value) & (self.keys_obtained[g] > 0)
+            g, nr, nc = g[opens], nr[opens], nc[opens]
+            self.keys_obtained[g] -= 1
+            self.grid[g, nr, nc] = Map.THIN_ICE.value
+
+    def check_progress(self):
+        """Game.check_progress vetorizado.
+
+        Retorna (códigos de resultado, razão de tiles) por partida e já
+        carrega o próximo nível ou recarrega o atual, como `Game`.
+        """
+        games = np.arange(self.num_games)
+        result = np.full(self.num_games, CONTINUE, dtype=np.int8)
+        ratio = np.zeros(self.num_games, dtype=np.float64)
+
+        at_finish = self.grid[games, self.player_y, self.player_x] == Map.FINISH.value
+        if self.perfect_score_required:
+            total = self.tpl_total_tiles[self.level_id]
+            perfect = self.current_tiles == total
+            success = at_finish & perfect
+            not_sufficient = at_finish & ~perfect
+            ratio[not_sufficient] = self.current_tiles[not_sufficient] / total[not_sufficient]
+        else:
+            success = at_finish
+            not_sufficient = np.zeros(self.num_games, dtype=bool)
+        ratio[success] = 1.0
+
+        can_move = np.zeros(self.num_games, dtype=bool)
+        for dr, dc in NEIGHBOURS:
+            nr, nc = self.player_y + dr, self.player_x + dc
+            tile, inside = self._tile_at(games, nc, nr)
+            cr, cc = np.clip(nr, 0, GRID_HEIGHT - 1), np.clip(nc, 0, GRID_WIDTH - 1)
+            has_block = (self.items[games, cr, cc] & Item.BLOCK) != 0
+            beyond, _ = self._tile_at(games, nc + dc, nr + dr)
+            can_move |= inside & (
+                ((tile == Map.LOCK.value) & (self.keys_obtained > 0))
+                | (~BLOCKING_TILES[tile] & ~has_block)
+                | (has_block & ~BLOCKING_TILES[beyond])
+            )
+        game_over = ~at_finish & ~can_move
+
+        result[success] = SUCCESS
+        result[not_sufficient] = NOT_SUFFICIENT
+        result[game_over] = GAME_OVER
+
+        if success.any():
+            self.load_next_level(success)
+        if (not_sufficient | game_over).any():
+            self.reload_level(not_sufficient | game_over)
+        return result, ratio
+
+    def step(self, actions):
+        """Um passo completo (movimento + blocos + check_progress) para as N partidas."""
+        moved = self.move_players(actions)
+        result, ratio = self.check_progress()
+        return moved, result, ratio
+
+    # ---------- Consultas ----------
+
+    def action_masks(self):
+        """Máscara (N, 4) equivalente a ThinIceEnv.action_masks."""
+        games = np.arange(self.num_games)
+        masks = np.zeros((self.num_games, 4), dtype=bool)
+        for action in range(4):
+            tile, inside = self._tile_at(games, self.player_x + ACTION_DX[action], self.player_y + ACTION_DY[action])
+            masks[:, action] = inside & ~SOLID_TILES[tile]
+        return masks
+
+    def all_ice_reachable(self):
+        """Versão em lote de ThinIceEnv.all_ice_reachable via flood fill vetorizado."""
+        n = self.num_games
+        games = np.arange(n)
+        passable = ~SOLID_TILES[self.grid]
+        ice = (self.grid == Map.THIN_ICE.value) | (self.grid == Map.THICK_ICE.value)
+        teleport_exit = self.tpl_teleport_exit[self.level_id]
+        has_teleports = (teleport_exit >= 0).any(axis=1)
+
+        reached = np.zeros_like(passable)
+        reached[games, self.player_y, self.player_x] = True
+        while True:
+            grown = reached.copy()
+            grown[:, 1:, :] |= reached[:, :-1, :]
+            grown[:, :-1, :] |= reached[:, 1:, :]
+            grown[:, :, 1:] |= reached[:, :, :-1]
+            grown[:, :, :-1] |= reached[:, :, 1:]
+            grown &= passable
+            grown |= reached
+            if has_teleports.any():
+                flat = grown.reshape(n, -1)
+                g, cell = np.nonzero(flat & (teleport_exit >= 0))
+                flat[g, teleport_exit[g, cell]] = True
+            if np.array_equal(grown, reached):
+                break
+            reached = grown
+
+        return ~(ice & ~reached).reshape(n, -1).any(axis=1)
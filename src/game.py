@@ -2,7 +2,15 @@
 
 
 from src.levels import Level
-from src.mapping import Map
+from src.mapping import Map, Item, BLOCKING_TILES
+
+# Vizinhança 4-conectada como (dr, dc)
+DIRECTIONS = (
+    (-1, 0),
+    (1, 0),
+    (0, -1),
+    (0, 1)
+)
 
 class Game:
     def __init__(
@@ -28,13 +36,14 @@ class Game:
         #self.player_y = self.level.start[1]
         #self.keys_obtained = 0
         #self.block_mov = (None, (0, 0))
+        self.level_version = 0  # incrementa a cada carga de fase (invalida caches)
+        self.dirty_cells = []   # células (x, y) alteradas desde o último clear_dirty()
         self.reload_level()
 
         self.seed = seed
 
     def _in_bounds(self, x: int, y: int) -> bool:
-        rows = len(self.level.grid)
-        cols = len(self.level.grid[0])
+        rows, cols = self.level.grid.shape
         return 0 <= x < cols and 0 <= y < rows
     
     def load_new_level_variables(self):
@@ -44,6 +53,12 @@ class Game:
         self.player_y = self.level.start[1]
         self.keys_obtained = 0
         self.block_mov = (None, (0, 0))
+        self.level_version += 1
+        self.dirty_cells = []
+
+    def clear_dirty(self):
+        """Descarta as células sujas acumuladas (chamado por quem consome as mudanças)."""
+        self.dirty_cells = []
         
     def load_next_level(self):
         self.current_points += self.current_tiles * 2
@@ -60,12 +75,13 @@ class Game:
 
 
     def check_progress(self):
-        rows = len(self.level.grid)
-        cols = len(self.level.grid[0])
+        grid = self.level.grid
+        items = self.level.items
+        rows, cols = grid.shape
 
         # Verifica se o jogador chegou ao ponto final
 
-        if self.level.grid[self.player_y][self.player_x] == Map.FINISH.value:
+        if grid[self.player_y, self.player_x] == Map.FINISH.value:
             # Caso perfeito, verifica se todos os tiles foram coletados
             if self.perfect_score_required:
                 if self.current_tiles == self.level.total_tiles:
@@ -84,23 +100,19 @@ class Game:
             return "SUCCESS", 1.0  # Passou normalmente
 
         # Verifica se o jogador ficou sem movimentos válidos (Game Over)
-        directions = [
-            (-1, 0),
-            (1, 0),
-            (0, -1),
-            (0, 1)
-        ]
-        for dr, dc in directions:
+        for dr, dc in DIRECTIONS:
             nr, nc = self.player_y + dr, self.player_x + dc
             if 0 <= nr < rows and 0 <= nc < cols:
+                tile = grid[nr, nc]
+                has_block = items[nr, nc] & Item.BLOCK
                 # Lock is openable
-                if self.level.grid[nr][nc] == Map.LOCK.value and self.keys_obtained > 0:
+                if tile == Map.LOCK.value and self.keys_obtained > 0:
                     return "CONTINUE", 0
                 # Walkable tile available
-                if self.level.grid[nr][nc] not in (Map.WALL.value, Map.WATER.value, Map.LOCK.value) and (nc, nr) not in self.level.blocks:
+                if not BLOCKING_TILES[tile] and not has_block:
                     return "CONTINUE", 0
                 # Block is pushable
-                if (nc, nr) in self.level.blocks and self.level.grid[nr + dr][nc + dc] not in (Map.WALL.value, Map.WATER.value, Map.LOCK.value):
+                if has_block and not BLOCKING_TILES[grid[nr + dr, nc + dc]]:
                     return "CONTINUE", 0
 
         # Caso não tenha movimentos válidos, game over
@@ -108,52 +120,47 @@ class Game:
         return "GAME_OVER", 0  
 
     def check_coin_bag(self):
-        for coin_bag in self.level.coin_bags:
-            if self.player_x == coin_bag[0] and self.player_y == coin_bag[1]:
-                self.current_points += 100
-                self.level.coin_bags.remove(coin_bag)
-                return
+        if self.level.has_item(self.player_x, self.player_y, Item.COIN_BAG):
+            self.current_points += 100
+            self.level.remove_item(self.player_x, self.player_y, Item.COIN_BAG)
     
     def check_key(self):
-        for key in self.level.keys:
-            if self.player_x == key[0] and self.player_y == key[1]:
-                self.keys_obtained += 1
-                self.level.keys.remove(key)
-                return
+        if self.level.has_item(self.player_x, self.player_y, Item.KEY):
+            self.keys_obtained += 1
+            self.level.remove_item(self.player_x, self.player_y, Item.KEY)
             
     def check_lock(self, x, y):
-        rows = len(self.level.grid)
-        cols = len(self.level.grid[0])
-        directions = [
-            (-1, 0),
-            (1, 0),
-            (0, -1),
-            (0, 1)
-        ]
-        for dr, dc in directions:
+        grid = self.level.grid
+        rows, cols = grid.shape
+        for dr, dc in DIRECTIONS:
             nr, nc = y + dr, x + dc
             if 0 <= nr < rows and 0 <= nc < cols:
-                if self.level.grid[nr][nc] == Map.LOCK.value and self.keys_obtained > 0:
+                if grid[nr, nc] == Map.LOCK.value and self.keys_obtained > 0:
                     self.keys_obtained -= 1
-                    self.level.grid[nr][nc] = Map.THIN_ICE.value
+                    grid[nr, nc] = Map.THIN_ICE.value
+                    self.dirty_cells.append((nc, nr))
 
     def move_block(self, block, direction):
+        grid = self.level.grid
         new_x = block[0] + direction[0]
         new_y = block[1] + direction[1]
 
-        if self.level.grid[new_y][new_x] in (Map.WALL.value, Map.LOCK.value, Map.WATER.value):
+        if BLOCKING_TILES[grid[new_y, new_x]]:
             self.block_mov = (None, (0,0))
             return
         
-        if self.level.grid[new_y][new_x] == Map.TELEPORT.value:
-            new_x, new_y = self.level.teleports[1 - self.level.teleports.index((new_x, new_y))]
+        if grid[new_y, new_x] == Map.TELEPORT.value:
+            new_x, new_y = map(int, self.level.teleport_exit[new_y, new_x])
         
-        self.level.blocks.remove(block)
-        self.level.blocks.append((new_x, new_y))
+        self.level.remove_item(block[0], block[1], Item.BLOCK)
+        self.level.add_item(new_x, new_y, Item.BLOCK)
+        self.dirty_cells.append(block)
+        self.dirty_cells.append((new_x, new_y))
         self.block_mov = ((new_x, new_y), direction)
 
 
     def move_player(self, direction):
+        grid = self.level.grid
         new_x = self.player_x + direction[0]
         new_y = self.player_y + direction[1]
 
@@ -161,32 +168,35 @@ class Game:
         if not self._in_bounds(new_x, new_y):
             return                       
 
-        if self.level.grid[new_y][new_x] in (Map.WALL.value, Map.LOCK.value, Map.WATER.value):
+        if BLOCKING_TILES[grid[new_y, new_x]]:
             return
         
-        if (new_x, new_y) in (self.level.blocks):
-            if self.level.grid[new_y + direction[1]][new_x + direction[0]] in (Map.WALL.value, Map.WATER.value, Map.LOCK.value):
+        if self.level.has_item(new_x, new_y, Item.BLOCK):
+            if BLOCKING_TILES[grid[new_y + direction[1], new_x + direction[0]]]:
                 return
             self.block_mov = ((new_x, new_y), direction)
             self.move_block(self.block_mov[0], direction)
 
-        current_tile = self.level.grid[self.player_y][self.player_x]
+        self.dirty_cells.append((self.player_x, self.player_y))
+        current_tile = grid[self.player_y, self.player_x]
         if current_tile == Map.THIN_ICE.value:
-            self.level.grid[self.player_y][self.player_x] = Map.WATER.value
+            grid[self.player_y, self.player_x] = Map.WATER.value
         elif current_tile == Map.THICK_ICE.value:
-            self.level.grid[self.player_y][self.player_x] = Map.THIN_ICE.value
+            grid[self.player_y, self.player_x] = Map.THIN_ICE.value
 
         self.check_lock(new_x, new_y)
 
-        if self.level.grid[new_y][new_x] == Map.TELEPORT.value:
-            new_x, new_y = self.level.teleports[1 - self.level.teleports.index((new_x, new_y))]
-            for teleport in self.level.teleports:
-                self.level.grid[teleport[1]][teleport[0]] = Map.TILE.value
+        if grid[new_y, new_x] == Map.TELEPORT.value:
+            new_x, new_y = map(int, self.level.teleport_exit[new_y, new_x])
+            teleports = self.level.teleport_cells
+            grid[teleports[:, 1], teleports[:, 0]] = Map.TILE.value
+            self.dirty_cells.extend(self.level.teleports)
             self.player_x = new_x
             self.player_y = new_y
 
         self.player_x = new_x
         self.player_y = new_y
+        self.dirty_cells.append((new_x, new_y))
         self.current_points += 1
         self.current_tiles += 1
 
@@ -4,10 +4,9 @@ import pygame
 import sys
 from src.levels import get_level
 from src.game import Game
-from src.utils import draw_game_screen
+from src.utils import GameScreenRenderer
 from src.learning.thin_ice_env import ThinIceEnv
-from sb3_contrib import MaskablePPO
-from sb3_contrib.common.maskable.utils import get_action_masks
+from src.agents.numpy_policy import PolicyRunner
 import os
 
 pygame.init()
@@ -34,10 +33,12 @@ initial_level = get_level(level_folder, 0)
 clock = pygame.time.Clock()
 
 env = ThinIceEnv()
-model = MaskablePPO.load(os.path.join('models', 'ppo_thin_ice'), env)
+# Exported with: python -m src.agents.numpy_policy ppo models/ppo_thin_ice.zip models/ppo_thin_ice.npz
+model = PolicyRunner(os.path.join('models', 'ppo_thin_ice.npz'))
 
 obs, _ = env.reset()
 done = False
+renderer = GameScreenRenderer(screen, font)
 
 while True:
     for event in pygame.event.get():
@@ -49,15 +50,10 @@ while True:
         pygame.quit()
         sys.exit()
 
-    action_masks = get_action_masks(env)
-    action, _states = model.predict(obs, action_masks=action_masks)
+    action = model.act(obs, env.action_masks())
     obs, reward, terminated, truncated, info = env.step(action)
     done = terminated or truncated
 
-    screen.fill(WHITE)
-
-    draw_game_screen(env.game, screen, font)
-    
-    pygame.display.flip()
+    pygame.display.update(renderer.draw(env.game))
     clock.tick(10)
     
@@ -0,0 +1,100 @@
+import numpy as np
+
+from src.mapping import Map, Item
+
+# 0 - Standard tiles
+# 1 - Thin Ice
+# 2 - Thick Ice
+# 3 - Locks and keys
+# 4 - Player
+# 5 - Pushable blocks
+# 6 - Coin bags
+# 7 - Teleports
+# 8 - Level finish
+# 9 - Walls and water
+OBS_SHAPE = (10, 15, 19)
+
+# Channel of each tile value (-1 = no channel)
+TILE_CHANNEL = np.full(len(Map), -1, dtype=np.int64)
+TILE_CHANNEL[Map.TILE.value] = 0
+TILE_CHANNEL[Map.THIN_ICE.value] = 1
+TILE_CHANNEL[Map.THICK_ICE.value] = 2
+TILE_CHANNEL[Map.LOCK.value] = 3
+TILE_CHANNEL[Map.FINISH.value] = 8
+TILE_CHANNEL[Map.WALL.value] = 9
+TILE_CHANNEL[Map.WATER.value] = 9
+
+# One-hot row per tile value: TILE_ONE_HOT[grid] gives (..., H, W, 10)
+TILE_ONE_HOT = np.zeros((len(Map), OBS_SHAPE[0]), dtype=np.uint8)
+for _value, _channel in enumerate(TILE_CHANNEL):
+    if _channel >= 0:
+        TILE_ONE_HOT[_value, _channel] = 1
+
+# Channels contributed by each item bit combination: ITEM_ONE_HOT[items] gives (..., H, W, 10)
+ITEM_ONE_HOT = np.zeros((256, OBS_SHAPE[0]), dtype=np.uint8)
+for _bits in range(256):
+    ITEM_ONE_HOT[_bits, 3] = bool(_bits & Item.KEY)
+    ITEM_ONE_HOT[_bits, 5] = bool(_bits & Item.BLOCK)
+    ITEM_ONE_HOT[_bits, 6] = bool(_bits & Item.COIN_BAG)
+
+
+def encode_observation(grid, items, teleport_mask, out=None):
+    """Vectorized one-hot encoding of tiles, items and teleports.
+
+    Works on a single level (H, W) or a batch (N, H, W) and returns
+    channel-first planes (10, H, W) / (N, 10, H, W). The player plane is
+    left empty for the caller to fill.
+    """
+    planes = TILE_ONE_HOT[grid] | ITEM_ONE_HOT[items]
+    planes[..., 7] |= teleport_mask
+    planes = np.moveaxis(planes, -1, -3)
+    if out is None:
+        return np.ascontiguousarray(planes)
+    out[...] = planes
+    return out
+
+
+class ObservationEncoder:
+    """Observation cache for one Game, patched with the cells the game reports dirty.
+
+    The full one-hot encoding is rebuilt only when the game loads a level
+    (`Game.level_version` changes); after a move only the cells listed in
+    `Game.dirty_cells` plus the old and new player positions are rewritten.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.obs = np.zeros(OBS_SHAPE, dtype=np.uint8)
+        self.teleport_mask = np.zeros(OBS_SHAPE[1:], dtype=bool)
+        self._level_version = None
+        self._player = None
+
+    def rebuild(self):
+        level = self.game.level
+        self.teleport_mask[:] = False
+        teleports = level.teleport_cells
+        self.teleport_mask[teleports[:, 1], teleports[:, 0]] = True
+
+        encode_observation(level.grid, level.items, self.teleport_mask, out=self.obs)
+        self._player = (self.game.player_x, self.game.player_y)
+        self.obs[4, self._player[1], self._player[0]] = 1
+        self._level_version = self.game.level_version
+        return self.obs
+
+    def update(self):
+        """Brings the cached observation up to date and returns it (not a copy)."""
+        game = self.game
+        if self._level_version != game.level_version:
+            return self.rebuild()
+
+        player = (game.player_x, game.player_y)
+        if not game.dirty_cells and player == self._player:
+            return self.obs
+
+        xs, ys = np.array(game.dirty_cells + [self._player, player], dtype=np.int64).T
+        level = game.level
+        self.obs[:, ys, xs] = (TILE_ONE_HOT[level.grid[ys, xs]] | ITEM_ONE_HOT[level.items[ys, xs]]).T
+        self.obs[7, ys, xs] = self.teleport_mask[ys, xs]
+        self.obs[4, player[1], player[0]] = 1
+        self._player = player
+        return self.obs
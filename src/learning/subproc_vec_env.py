@@ -0,0 +1,262 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env.base_vec_env import (
+    CloudpickleWrapper,
+    VecEnv,
+    VecEnvIndices,
+    VecEnvObs,
+    VecEnvStepReturn,
+)
+
+MASK_METHOD = "action_masks"
+
+
+def _shared_views(shm, num_envs, obs_space, n_actions, start, stop):
+    """Observation and action-mask arrays laid out back to back in `shm`, rows [start, stop)."""
+    obs = np.ndarray((num_envs, *obs_space.shape), dtype=obs_space.dtype, buffer=shm.buf)
+    masks = np.ndarray((num_envs, n_actions), dtype=bool, buffer=shm.buf, offset=obs.nbytes)
+    return obs[start:stop], masks[start:stop]
+
+
+def _worker(remote, parent_remote, env_fns_wrapper):
+    """Runs K environments in one process; observations and masks go through shared memory."""
+    from stable_baselines3.common.env_util import is_wrapped
+
+    parent_remote.close()
+    envs = [fn() for fn in env_fns_wrapper.var]
+    has_masks = all(hasattr(env, MASK_METHOD) for env in envs)
+    shm = obs_buf = mask_buf = None
+
+    def publish(i, obs):
+        obs_buf[i] = obs
+        if has_masks:
+            mask_buf[i] = envs[i].action_masks()
+
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                rewards = np.zeros(len(envs), dtype=np.float32)
+                dones = np.zeros(len(envs), dtype=bool)
+                infos, reset_infos = [], []
+                for i, (env, action) in enumerate(zip(envs, data)):
+                    obs, reward, terminated, truncated, info = env.step(action)
+                    done = terminated or truncated
+                    info["TimeLimit.truncated"] = truncated and not terminated
+                    reset_info = {}
+                    if done:
+                        # Same contract as SB3's SubprocVecEnv: keep the final observation, then reset
+                        info["terminal_observation"] = obs
+                        obs, reset_info = env.reset()
+                    publish(i, obs)
+                    rewards[i], dones[i] = reward, done
+                    infos.append(info)
+                    reset_infos.append(reset_info)
+                remote.send((rewards, dones, infos, reset_infos))
+            elif cmd == "reset":
+                reset_infos = []
+                for i, (env, (seed, options)) in enumerate(zip(envs, data)):
+                    maybe_options = {"options": options} if options else {}
+                    obs, reset_info = env.reset(seed=seed, **maybe_options)
+                    publish(i, obs)
+                    reset_infos.append(reset_info)
+                remote.send(reset_infos)
+            elif cmd == "get_spaces":
+                remote.send((envs[0].observation_space, envs[0].action_space, has_masks))
+            elif cmd == "attach":
+                name, num_envs, start = data
+                shm = shared_memory.SharedMemory(name=name)
+                obs_space, action_space = envs[0].observation_space, envs[0].action_space
+                obs_buf, mask_buf = _shared_views(shm, num_envs, obs_space, action_space.n,
+                                                  start, start + len(envs))
+                remote.send(None)
+            elif cmd == "env_method":
+                name, args, kwargs, local = data
+                remote.send([getattr(envs[i], name)(*args, **kwargs) for i in local])
+            elif cmd == "get_attr":
+                name, local = data
+                try:
+                    remote.send([getattr(envs[i], name) for i in local])
+                except AttributeError as exc:
+                    remote.send(exc)  # re-raised by the parent
+            elif cmd == "has_attr":
+                remote.send(hasattr(envs[0], data))
+            elif cmd == "set_attr":
+                name, value, local = data
+                for i in local:
+                    setattr(envs[i], name, value)
+                remote.send(None)
+            elif cmd == "is_wrapped":
+                wrapper_class, local = data
+                remote.send([is_wrapped(envs[i], wrapper_class) for i in local])
+            elif cmd == "render":
+                remote.send([env.render() for env in envs])
+            elif cmd == "close":
+                for env in envs:
+                    env.close()
+                obs_buf = mask_buf = None
+                if shm is not None:
+                    shm.close()
+                remote.close()
+                break
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except (EOFError, KeyboardInterrupt):
+            break
+
+
+class SubprocThinIceVecEnv(VecEnv):
+    """
+    SB3-compatible VecEnv that runs `envs_per_worker` environments per subprocess.
+
+    Unlike SB3's SubprocVecEnv (one process and one pickled observation per
+    env per step), each worker steps a group of K environments sequentially
+    and writes observations and action masks straight into a shared-memory
+    block; only rewards, dones and infos cross the pipe. Finished episodes
+    are reset automatically, with the last observation kept in
+    `info["terminal_observation"]`, and `env_method("action_masks")` is served
+    from the shared masks without a round trip, so MaskablePPO works as-is.
+
+    :param env_fns: callables that build each environment (e.g. ThinIceEnv)
+    :param envs_per_worker: environments per subprocess
+    :param start_method: multiprocessing start method (default: forkserver if available)
+    """
+
+    def __init__(self, env_fns: List[Callable[[], gym.Env]], envs_per_worker: int = 4,
+                 start_method: Optional[str] = None):
+        self.waiting = False
+        self.closed = False
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        num_envs = len(env_fns)
+        self.groups = [list(range(i, min(i + envs_per_worker, num_envs)))
+                       for i in range(0, num_envs, envs_per_worker)]
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in self.groups])
+        self.processes = []
+        for group, work_remote, remote in zip(self.groups, self.work_remotes, self.remotes):
+            wrapper = CloudpickleWrapper([env_fns[i] for i in group])
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            process = ctx.Process(target=_worker, args=(work_remote, remote, wrapper), daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.remotes[0].send(("get_spaces", None))
+        observation_space, action_space, self.has_masks = self.remotes[0].recv()
+        super().__init__(num_envs, observation_space, action_space)
+
+        obs_bytes = num_envs * int(np.prod(observation_space.shape)) * np.dtype(observation_space.dtype).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=obs_bytes + num_envs * action_space.n)
+        self._obs, self._masks = _shared_views(self._shm, num_envs, observation_space, action_space.n, 0, num_envs)
+        for group, remote in zip(self.groups, self.remotes):
+            remote.send(("attach", (self._shm.name, num_envs, group[0])))
+        for remote in self.remotes:
+            remote.recv()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        for group, remote in zip(self.groups, self.remotes):
+            remote.send(("step", actions[group[0]:group[-1] + 1]))
+        self.waiting = True
+
+    def step_wait(self) -> VecEnvStepReturn:
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        rewards, dones, infos, reset_infos = zip(*results)
+        self.reset_infos = [info for group in reset_infos for info in group]
+        return (
+            self._obs.copy(),
+            np.concatenate(rewards),
+            np.concatenate(dones),
+            [info for group in infos for info in group],
+        )
+
+    def reset(self) -> VecEnvObs:
+        for group, remote in zip(self.groups, self.remotes):
+            remote.send(("reset", [(self._seeds[i], self._options[i]) for i in group]))
+        self.reset_infos = [info for remote in self.remotes for info in remote.recv()]
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs.copy()
+
+    def action_masks(self) -> np.ndarray:
+        """Masks of the current observations, shape (num_envs, n_actions)."""
+        return self._masks.copy()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self._obs = self._masks = None
+        self._shm.close()
+        self._shm.unlink()
+        self.closed = True
+
+    def get_images(self):
+        if self.render_mode != "rgb_array":
+            return [None for _ in range(self.num_envs)]
+        for remote in self.remotes:
+            remote.send(("render", None))
+        return [image for remote in self.remotes for image in remote.recv()]
+
+    # ---------- Attribute and method forwarding ----------
+
+    def _targets(self, indices: VecEnvIndices):
+        """(remote, local indices) pairs covering `indices`, in order."""
+        wanted = set(self._get_indices(indices))
+        for group, remote in zip(self.groups, self.remotes):
+            local = [i - group[0] for i in group if i in wanted]
+            if local:
+                yield remote, local
+
+    def _call(self, cmd, payload, indices: VecEnvIndices) -> List[Any]:
+        targets = list(self._targets(indices))
+        for remote, local in targets:
+            remote.send((cmd, (*payload, local)))
+        replies = [remote.recv() for remote, _ in targets]
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        return [result for reply in replies for result in reply]
+
+    def has_attr(self, attr_name: str) -> bool:
+        self.remotes[0].send(("has_attr", attr_name))
+        return self.remotes[0].recv()
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        return self._call("get_attr", (attr_name,), indices)
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        targets = list(self._targets(indices))
+        for remote, local in targets:
+            remote.send(("set_attr", (attr_name, value, local)))
+        for remote, _ in targets:
+            remote.recv()
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        if method_name == MASK_METHOD and self.has_masks and not method_args and not method_kwargs:
+            return list(self._masks[list(self._get_indices(indices))])
+        return self._call("env_method", (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        return self._call("is_wrapped", (wrapper_class,), indices)
+
+
+def make_thin_ice_vec_env(num_envs: int, envs_per_worker: int = 4, env_fn: Callable[[], gym.Env] = None,
+                          start_method: Optional[str] = None) -> SubprocThinIceVecEnv:
+    """Builds a SubprocThinIceVecEnv of `num_envs` ThinIceEnv instances (or `env_fn()` ones)."""
+    if env_fn is None:
+        from src.learning.thin_ice_env import ThinIceEnv
+        env_fn = ThinIceEnv
+    return SubprocThinIceVecEnv([env_fn for _ in range(num_envs)], envs_per_worker, start_method)
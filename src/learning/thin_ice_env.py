@@ -5,14 +5,24 @@ from src.levels import Level
 from src.game import Game
 from src.mapping import Map
 from src.levels import Level
-from collections import deque
+from src.learning.observation import ObservationEncoder
+from src.reachability import ReachabilityTracker
+from src.renderer import FrameRenderer
 
 LEVELS_FOLDER = 'original_game'
 
 class ThinIceEnv(gym.Env):
-    def __init__(self):
+    metadata = {"render_modes": ["rgb_array"], "render_fps": 10}
+
+    def __init__(self, render_mode=None):
         super(ThinIceEnv, self).__init__()
 
+        # "rgb_array": render() returns the board as an (H, W, 3) uint8 frame, no pygame display needed
+        if render_mode is not None and render_mode not in self.metadata["render_modes"]:
+            raise ValueError(f"Unsupported render_mode: {render_mode}")
+        self.render_mode = render_mode
+        self.renderer = FrameRenderer() if render_mode == "rgb_array" else None
+
         # Actions: 0=up, 1=down, 2=left, 3=right
         self.action_space = spaces.Discrete(4)
 
@@ -38,12 +48,18 @@ class ThinIceEnv(gym.Env):
     def reset(self, *, seed=None, options=None):
         super().reset(seed=seed)
 
-        level = Level(LEVELS_FOLDER, 0)
-        print(level)
+        # options may pick the level set and starting level (defaults: original_game, level 0)
+        options = options or {}
+        level = Level(
+            options.get("level_folder", LEVELS_FOLDER),
+            current_level_id=options.get("level_index", 0),
+        )
         self.game = Game(
                         level = level,
                         perfect_score_required = False,
                     )
+        self.encoder = ObservationEncoder(self.game)
+        self.reachability = ReachabilityTracker(self.game)
         self.visited = set()
         return self._get_obs(), {}
 
@@ -51,11 +67,13 @@ class ThinIceEnv(gym.Env):
     def step(self, action):
         direction = [(0, -1), (0, 1), (-1, 0), (1, 0)][action]
 
+        self.game.clear_dirty()
         self.game.move_player(direction)
 
         moving_block, block_direction = self.game.block_mov
-        while moving_block != None:
+        while moving_block is not None:
             self.game.move_block(moving_block, block_direction)
+            moving_block, block_direction = self.game.block_mov
 
         self.game.check_progress()
 
@@ -93,41 +111,15 @@ class ThinIceEnv(gym.Env):
         return reward
 
     def _get_obs(self):
-        grid = self.game.level.grid
-        obs = np.zeros(self.obs_shape, dtype=np.uint8)
-
-        for y in range(15):
-            for x in range(19):
-                tile = grid[y][x]
-                if tile == Map.TILE.value:
-                    obs[0, y, x] = 1
-                elif tile == Map.THIN_ICE.value:
-                    obs[1, y, x] = 1
-                elif tile == Map.THICK_ICE.value:
-                    obs[2, y, x] = 1
-                elif tile == Map.LOCK.value:
-                    obs[3, y, x] = 1
-                elif tile == Map.FINISH.value:
-                    obs[8, y, x] = 1
-                elif tile in (Map.WALL.value, Map.WATER.value):
-                    obs[9, y, x] = 1
-
-        obs[4, self.game.player_y, self.game.player_x] = 1
-
-        for block in self.game.level.blocks:
-            obs[5, block[1], block[0]] = 1
-
-        for key in self.game.level.keys:
-            obs[3, key[1], key[0]] = 1
-
-        for coin in self.game.level.coin_bags:
-            obs[6, coin[1], coin[0]] = 1
-
-        for teleport in self.game.level.teleports:
-            obs[7, teleport[1], teleport[0]] = 1
-
-        return obs
+        # The encoder patches its cached planes in place; hand out a copy since
+        # callers (e.g. replay buffers) keep references to past observations.
+        return self.encoder.update().copy()
     
+    def render(self):
+        if self.renderer is None:
+            return None
+        return self.renderer.render_game(self.game)
+
     def action_masks(self):
         mask = np.ones(4, dtype=bool)
         for i, (dx, dy) in enumerate([(0, -1), (0, 1), (-1, 0), (1, 0)]):
@@ -140,55 +132,6 @@ class ThinIceEnv(gym.Env):
         return (0 <= x < 19 and 0 <= y < 15 and self.game.level.grid[y][x] not in [Map.WALL.value, Map.WATER.value])
         
     def all_ice_reachable(self):
-        grid = self.game.level.grid
-        height = len(grid)
-        width = len(grid[0])
-        visited = [[False for _ in range(width)] for _ in range(height)]
-        ice_tiles = set()
-        reachable_ice = set()
-
-        # Map teleport pairs (assumes bidirectional pairing)
-        teleport_map = {}
-        teleports = self.game.level.teleports
-        if len(teleports) % 2 == 0:
-            for i in range(0, len(teleports), 2):
-                a = teleports[i]
-                b = teleports[i + 1]
-                teleport_map[a] = b
-                teleport_map[b] = a
-
-        # Identify all ice tile positions
-        for y in range(height):
-            for x in range(width):
-                tile = grid[y][x]
-                if tile in (Map.THIN_ICE.value, Map.THICK_ICE.value):
-                    ice_tiles.add((x, y))
-
-        # BFS from player's current position
-        queue = deque()
-        queue.append((self.game.player_x, self.game.player_y))
-        visited[self.game.player_y][self.game.player_x] = True
-
-        while queue:
-            x, y = queue.popleft()
-
-            if (x, y) in ice_tiles:
-                reachable_ice.add((x, y))
-
-            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < width and 0 <= ny < height and not visited[ny][nx]:
-                    tile = grid[ny][nx]
-                    if tile not in (Map.WALL.value, Map.WATER.value):
-                        visited[ny][nx] = True
-                        queue.append((nx, ny))
-
-            # Handle teleportation
-            if (x, y) in teleport_map:
-                tx, ty = teleport_map[(x, y)]
-                if not visited[ty][tx]:
-                    visited[ty][tx] = True
-                    queue.append((tx, ty))
-
-        return reachable_ice == ice_tiles
-    
\ No newline at end of file
+        # Connected components are maintained incrementally from the cells
+        # the game marks dirty, so this no longer runs a BFS every step.
+        return self.reachability.all_ice_reachable()
@@ -1,12 +1,16 @@
 import os
 from sb3_contrib import MaskablePPO
-from src.learning.thin_ice_env import ThinIceEnv
+from src.learning.subproc_vec_env import make_thin_ice_vec_env
 
 SAVE_PATH = "models"
+NUM_ENVS = 16          # parallel ThinIceEnv instances
+ENVS_PER_WORKER = 4    # environments stepped by each subprocess
 
-print("Starting training...")
-env = ThinIceEnv()
-model = MaskablePPO("MlpPolicy", env, verbose=1)
-model.learn(total_timesteps=1_000_000)
-model.save(os.path.join(SAVE_PATH, "ppo_thin_ice"))
-print("Training finished!")
\ No newline at end of file
+if __name__ == "__main__":
+    print("Starting training...")
+    env = make_thin_ice_vec_env(NUM_ENVS, ENVS_PER_WORKER)
+    model = MaskablePPO("MlpPolicy", env, verbose=1)
+    model.learn(total_timesteps=1_000_000)
+    model.save(os.path.join(SAVE_PATH, "ppo_thin_ice"))
+    env.close()
+    print("Training finished!")
@@ -0,0 +1,109 @@
+import numpy as np
+from gymnasium import spaces
+
+from src.batch_game import BatchGame, SUCCESS
+from src.learning.observation import OBS_SHAPE, encode_observation
+from src.mapping import Map
+from src.renderer import FrameRenderer
+
+LEVELS_FOLDER = 'original_game'
+
+
+class VectorThinIceEnv:
+    """N cópias de ThinIceEnv avançadas juntas por um BatchGame.
+
+    Segue a API de ambientes vetorizados do Gymnasium: `reset()` devolve
+    observações empilhadas `(N, 10, 15, 19)` e `step(actions)` devolve
+    `(obs, rewards, terminated, truncated, infos)`. Ambientes que terminam
+    (última fase concluída ou `max_steps` atingido) são reiniciados no mesmo
+    passo; a observação devolvida já é a do reinício e a anterior fica em
+    `infos["final_observation"]` (todas as linhas; valem as de ambientes que terminaram).
+    Com `render_mode="rgb_array"`, `render()` devolve os quadros de todos os
+    ambientes em um array (N, H, W, 3), sem pygame.
+    """
+
+    metadata = {"render_modes": ["rgb_array"], "render_fps": 10}
+
+    def __init__(self, num_envs, level_folder=LEVELS_FOLDER, perfect_score_required=False, max_steps=None,
+                 render_mode=None):
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        self.render_mode = render_mode
+        self.renderer = FrameRenderer() if render_mode == "rgb_array" else None
+
+        self.single_action_space = spaces.Discrete(4)
+        self.obs_shape = OBS_SHAPE
+        self.single_observation_space = spaces.Box(low=0, high=1, shape=self.obs_shape, dtype=np.uint8)
+        self.action_space = spaces.MultiDiscrete(np.full(num_envs, 4))
+        self.observation_space = spaces.Box(low=0, high=1, shape=(num_envs, *self.obs_shape), dtype=np.uint8)
+
+        self.game = BatchGame(
+            level_folder,
+            num_envs,
+            perfect_score_required=perfect_score_required,
+        )
+        self.points = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, *, seed=None, options=None):
+        self.game.reset()
+        self.points[:] = 0
+        self.steps[:] = 0
+        return self._get_obs(), {}
+
+    def step(self, actions):
+        level_before = self.game.level_id.copy()
+        _, result, _ = self.game.step(actions)
+        self.steps += 1
+
+        obs = self._get_obs()
+        rewards = self._compute_rewards()
+
+        # Fim de jogo: concluiu a última fase do conjunto
+        terminated = (result == SUCCESS) & (level_before == self.game.max_level_id)
+        truncated = np.zeros(self.num_envs, dtype=bool) if self.max_steps is None else self.steps >= self.max_steps
+        infos = {"result": result}
+
+        done = terminated | truncated
+        if done.any():
+            # Observação final antes do reinício, para bootstrap de episódios truncados
+            infos["final_observation"] = obs.copy()
+            self.game.reset(done)
+            self.points[done] = 0
+            self.steps[done] = 0
+            obs[done] = self._get_obs()[done]
+        return obs, rewards, terminated, truncated, infos
+
+    def _compute_rewards(self):
+        game = self.game
+        envs = np.arange(self.num_envs)
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+
+        diff = game.current_points - self.points
+        self.points = game.current_points.copy()
+
+        rewards[~game.all_ice_reachable()] -= 10
+        gained = diff > 0
+        rewards[gained] += np.where(diff[gained] < 100, diff[gained], diff[gained] + 0.5)
+        start = game.tpl_start[game.level_id]
+        at_start = (game.player_x == start[:, 0]) & (game.player_y == start[:, 1])
+        rewards[~gained & at_start] -= 100
+        rewards[~gained & ~at_start] -= 0.5
+        # ThinIceEnv compara (x, y) com um conjunto de (fase, x, y): o bônus de exploração sempre é dado
+        rewards += 0.1
+        rewards[game.grid[envs, game.player_y, game.player_x] == Map.FINISH.value] += 50
+        return rewards
+
+    def _get_obs(self):
+        game = self.game
+        obs = encode_observation(game.grid, game.items, game.tpl_teleport_mask[game.level_id])
+        obs[np.arange(self.num_envs), 4, game.player_y, game.player_x] = 1
+        return obs
+
+    def render(self):
+        if self.renderer is None:
+            return None
+        return self.renderer.render_batch(self.game)
+
+    def action_masks(self):
+        return self.game.action_masks()
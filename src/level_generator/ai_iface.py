@@ -13,8 +13,8 @@ from .core import LevelCore
 from .movement import *
 
 class LevelCreatorEnv(LevelCore):
-    def __init__(self, load_folder = 'custom_created_agent'):
-        super().__init__(load_folder)
+    def __init__(self, load_folder = 'custom_created_agent', headless = False):
+        super().__init__(load_folder, headless)
 
     ACTIONS = (
         MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT,
@@ -27,10 +27,10 @@ class LevelCreatorEnv(LevelCore):
         True se a ação foi executada com sucesso."""
         action = self.ACTIONS[action_idx]
         valid = apply_action(self, action)
-        if pygame.display.get_init():
+        if self.screen is not None and pygame.display.get_init():
             draw_level(self)
         return valid
 
     def reset(self):
         """Reinicia o nível (útil para treino)."""
-        self.__init__()
+        self.__init__(self.load_folder, self.headless)
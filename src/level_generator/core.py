@@ -1,8 +1,10 @@
 # src/level_generation/core.py
 
+import numpy as np
 import pygame
 from src.mapping import *
 from src.utils import init_screen
+from src.renderer import FrameRenderer
 from src.level_generator.drawing import *
 from src.level_generator.movement import *
 from src.level_generator.objects import *
@@ -12,10 +14,13 @@ from src.level_generator.save import *
 from src.level_generator.actions import *
 
 class LevelCore:
-    def __init__(self, load_folder = 'custom_created'):
+    def __init__(self, load_folder = 'custom_created', headless = False):
         self.load_folder = load_folder
+        self.headless = headless
         self.Map = Map
-        self.screen, self.font = init_screen()
+        # headless: sem janela; quadros só via render() (FrameRenderer)
+        self.screen, self.font = (None, None) if headless else init_screen()
+        self.renderer = None
         self.grid = [[Map.WALL.value for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
         self.start = self._get_random_start()
         self.grid[self.start[1]][self.start[0]] = Map.THIN_ICE.value
@@ -33,6 +38,17 @@ class LevelCore:
         self.coin_placed = False
         self.key_placed = False
 
+    def render(self):
+        """Quadro RGB (H, W, 3) do nível em construção, sem pygame."""
+        if self.renderer is None:
+            self.renderer = FrameRenderer()
+        items = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        for x, y in self.coin_bags:
+            items[y, x] |= Item.COIN_BAG
+        for x, y in self.keys:
+            items[y, x] |= Item.KEY
+        return self.renderer.render(np.asarray(self.grid, dtype=np.uint8), items, self.player_x, self.player_y)
+
     def _get_random_start(self):
         import random
         return (random.randint(1, GRID_WIDTH - 2), random.randint(1, GRID_HEIGHT - 2))
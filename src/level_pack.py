@@ -0,0 +1,177 @@
+# /src/level_pack.py
+#
+# Pacote binário de níveis: um único arquivo com cabeçalho fixo seguido de
+# registros de tamanho fixo, um por nível, na ordem dos índices. O registro i
+# começa em HEADER_SIZE + i * record_size, então o arquivo inteiro pode ser
+# mapeado com np.memmap e cada nível vira um conjunto de fatias sem cópia.
+
+import os
+
+import numpy as np
+from typing import Iterable, List
+
+from src.levels import (
+    LevelTemplate, count_levels, encode_levels_to_txt, load_level_template, register_level_source
+)
+from src.mapping import Item, GRID_HEIGHT, GRID_WIDTH
+
+PACK_MAGIC = b"TIPK"
+PACK_VERSION = 1
+MAX_TELEPORTS = 4
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("count", "<u4"),
+    ("record_size", "<u4"),
+    ("height", "<u2"),
+    ("width", "<u2"),
+    ("reserved", "u1", (12,)),
+])
+HEADER_SIZE = HEADER_DTYPE.itemsize
+
+RECORD_DTYPE = np.dtype([
+    ("grid", "u1", (GRID_HEIGHT, GRID_WIDTH)),   # valores de Map
+    ("items", "u1", (GRID_HEIGHT, GRID_WIDTH)),  # bits de Item
+    ("start", "<i2", (2,)),
+    ("teleports", "<i2", (MAX_TELEPORTS, 2)),
+    ("teleport_count", "u1"),
+    ("total_tiles", "<i4"),
+    ("total_points", "<i4"),
+])
+
+
+def _to_record(template: LevelTemplate, record) -> None:
+    teleports = template.teleport_cells
+    if len(teleports) > MAX_TELEPORTS:
+        raise ValueError(f"Nível com {len(teleports)} teletransportes (máximo {MAX_TELEPORTS})")
+    record["grid"] = template.grid
+    record["items"] = template.items
+    record["start"] = template.start
+    record["teleports"] = -1
+    record["teleports"][:len(teleports)] = teleports
+    record["teleport_count"] = len(teleports)
+    record["total_tiles"] = template.total_tiles
+    record["total_points"] = template.total_points
+
+
+def write_level_pack(path: str, templates: Iterable[LevelTemplate]) -> int:
+    """Grava os templates em um pacote binário; retorna a quantidade de níveis."""
+    templates = list(templates)
+    records = np.zeros(len(templates), dtype=RECORD_DTYPE)
+    for record, template in zip(records, templates):
+        _to_record(template, record)
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = PACK_MAGIC
+    header["version"] = PACK_VERSION
+    header["count"] = len(templates)
+    header["record_size"] = RECORD_DTYPE.itemsize
+    header["height"] = GRID_HEIGHT
+    header["width"] = GRID_WIDTH
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        header.tofile(f)
+        records.tofile(f)
+    os.replace(tmp_path, path)
+    return len(templates)
+
+
+class LevelPack:
+    """Pacote de níveis mapeado em memória; indexável como uma sequência de LevelTemplate."""
+
+    def __init__(self, path: str):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header["magic"][0] != PACK_MAGIC:
+            raise ValueError(f"{path} não é um pacote de níveis")
+        if header["version"][0] != PACK_VERSION or header["record_size"][0] != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path}: versão ou tamanho de registro incompatível")
+        if (header["height"][0], header["width"][0]) != (GRID_HEIGHT, GRID_WIDTH):
+            raise ValueError(f"{path}: dimensões de grid incompatíveis")
+
+        count = int(header["count"][0])
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,)) \
+            if count else np.zeros(0, dtype=RECORD_DTYPE)
+        self._templates = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> LevelTemplate:
+        template = self._templates.get(index)
+        if template is None:
+            record = self.records[index]
+            template = LevelTemplate(
+                record["grid"],
+                record["items"],
+                record["start"],
+                record["teleports"][:record["teleport_count"]],
+                total_tiles=record["total_tiles"],
+                total_points=record["total_points"],
+            )
+            self._templates[index] = template
+        return template
+
+    # Vistas em lote (sem cópia), úteis para BatchGame e afins
+    @property
+    def grids(self) -> np.ndarray:
+        return self.records["grid"]
+
+    @property
+    def items(self) -> np.ndarray:
+        return self.records["items"]
+
+
+def load_level_pack(path: str, folder: str = None) -> LevelPack:
+    """Abre um pacote e o registra como conjunto de níveis `folder` (padrão: nome do arquivo)."""
+    pack = LevelPack(path)
+    folder = folder or os.path.splitext(os.path.basename(path))[0]
+    register_level_source(folder, pack)
+    return pack
+
+
+def pack_folder(folder: str, path: str) -> int:
+    """Converte data/levels/<folder>/level_*.txt em um pacote binário."""
+    templates: List[LevelTemplate] = [load_level_template(folder, i) for i in range(count_levels(folder))]
+    return write_level_pack(path, templates)
+
+
+def unpack_to_folder(path: str, folder: str) -> int:
+    """Converte um pacote binário de volta para arquivos level_XXXX.txt em data/levels/<folder>."""
+    pack = LevelPack(path)
+    for index in range(len(pack)):
+        template = pack[index]
+        encode_levels_to_txt(
+            folder,
+            index,
+            template.grid,
+            template.start,
+            template.item_positions(Item.COIN_BAG),
+            template.item_positions(Item.KEY),
+            template.item_positions(Item.BLOCK),
+            template.teleports,
+            template.total_tiles,
+        )
+    return len(pack)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converte níveis entre arquivos .txt e pacote binário")
+    sub = parser.add_subparsers(dest="command", required=True)
+    to_pack = sub.add_parser("pack", help="data/levels/<folder>/*.txt -> pacote")
+    to_pack.add_argument("folder")
+    to_pack.add_argument("path")
+    to_txt = sub.add_parser("unpack", help="pacote -> data/levels/<folder>/*.txt")
+    to_txt.add_argument("path")
+    to_txt.add_argument("folder")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        print(f"[✓] {pack_folder(args.folder, args.path)} níveis gravados em {args.path}")
+    else:
+        print(f"[✓] {unpack_to_folder(args.path, args.folder)} níveis gravados em data/levels/{args.folder}")
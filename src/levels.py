@@ -1,11 +1,12 @@
 # /src/levels.py
 
-from src.mapping import Map, char_to_level_map, level_map_to_char
+from src.mapping import Map, Item, GRID_HEIGHT, GRID_WIDTH, char_to_level_map, level_map_to_char
 import random
 import copy
 import os
 
-from typing import List, Tuple
+import numpy as np
+from typing import Dict, Iterable, List, Sequence, Tuple
 
 
 class Level:
@@ -21,63 +22,113 @@ class Level:
 
         self.max_level_id: int = self.compute_max_level_id()
 
-        self.grid: List[List[int]] = []
+        # Estado canônico: tiles e itens como arrays (linha = y, coluna = x)
+        self.grid: np.ndarray = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.items: np.ndarray = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)  # bits de Item
         self.start: Tuple[int, int] = (0, 0)
-        self.coin_bags: List[Tuple[int, int]] = []
-        self.keys: List[Tuple[int, int]] = []
-        self.blocks: List[Tuple[int, int]] = []
-        self.teleports: List[Tuple[int, int]] = []
+        self.teleport_cells: np.ndarray = np.zeros((0, 2), dtype=np.int16)  # (x, y) de cada teletransporte
+        self.teleport_exit: np.ndarray = np.full((GRID_HEIGHT, GRID_WIDTH, 2), -1, dtype=np.int16)  # saída (x, y) do par
 
         self.load_level()
 
         #self.total_tiles: int = self.compute_total_tiles()
         #self.total_points: int = self.compute_total_points() 
 
+    # ---------- Visões em lista (API antiga) ----------
+
+    @property
+    def coin_bags(self) -> List[Tuple[int, int]]:
+        return self.item_positions(Item.COIN_BAG)
+
+    @coin_bags.setter
+    def coin_bags(self, positions: Iterable[Tuple[int, int]]) -> None:
+        self.set_item_positions(Item.COIN_BAG, positions)
+
+    @property
+    def keys(self) -> List[Tuple[int, int]]:
+        return self.item_positions(Item.KEY)
+
+    @keys.setter
+    def keys(self, positions: Iterable[Tuple[int, int]]) -> None:
+        self.set_item_positions(Item.KEY, positions)
+
+    @property
+    def blocks(self) -> List[Tuple[int, int]]:
+        return self.item_positions(Item.BLOCK)
+
+    @blocks.setter
+    def blocks(self, positions: Iterable[Tuple[int, int]]) -> None:
+        self.set_item_positions(Item.BLOCK, positions)
+
+    @property
+    def teleports(self) -> List[Tuple[int, int]]:
+        return [(int(x), int(y)) for x, y in self.teleport_cells]
+
+    @teleports.setter
+    def teleports(self, positions: Iterable[Tuple[int, int]]) -> None:
+        """Define os teletransportes; posições consecutivas (0-1, 2-3, ...) formam um par."""
+        self.teleport_cells, self.teleport_exit = teleport_tables(positions)
+
+    # ---------- Plano de itens ----------
+
+    def item_positions(self, item: Item) -> List[Tuple[int, int]]:
+        """Lista as posições (x, y) que contêm o item, em ordem de linha."""
+        ys, xs = np.nonzero(self.items & item)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def set_item_positions(self, item: Item, positions: Iterable[Tuple[int, int]]) -> None:
+        self.items &= ~np.uint8(item)
+        for x, y in positions:
+            self.items[y, x] |= item
+
+    def has_item(self, x: int, y: int, item: Item) -> bool:
+        return bool(self.items[y, x] & item)
+
+    def add_item(self, x: int, y: int, item: Item) -> None:
+        self.items[y, x] |= item
+
+    def remove_item(self, x: int, y: int, item: Item) -> None:
+        self.items[y, x] &= ~np.uint8(item)
 
     def compute_max_level_id(self) -> int:
         """Infere o número máximo de níveis dentro da pasta de níveis, considerando a indexação 0."""
-        output_dir, _ = get_level_path(self.level_folder, self.current_level_id)
-        level_files = [
-            f for f in os.listdir(output_dir)  # Alterei de 'output_dir' para 'os.listdir(output_dir)'
-            if f.endswith(".txt") and f.startswith("level_")
-        ]
+        level_count = count_levels(self.level_folder)
 
-        if not level_files:
+        if not level_count:
             print("Aviso: Não há arquivos de níveis na pasta.")
             return 0
 
-
         # O número de arquivos - 1, considerando que a indexação é de 0
-        return len(level_files) - 1 if level_files else 0
+        return level_count - 1
 
     def compute_total_tiles(self) -> int:
         """Calcula o total de tiles de gelo no nível (gelo fino e grosso)."""
-        return sum(
-            1 for row in self.grid for val in row if val == Map.THIN_ICE.value
-        ) + 2 * sum(
-            1 for row in self.grid for val in row if val == Map.THICK_ICE.value
-        ) + sum([1 if self.teleports else 0])  # Considera teletransporte como um tile
+        thin = int(np.count_nonzero(self.grid == Map.THIN_ICE.value))
+        thick = int(np.count_nonzero(self.grid == Map.THICK_ICE.value))
+        return thin + 2 * thick + (1 if len(self.teleport_cells) else 0)  # Considera teletransporte como um tile
 
     def compute_total_points(self) -> int:
         """Calcula a pontuação total, considerando gelo fino, grosso, sacos de moedas e outros itens."""
-        thin = sum(
-            1 for row in self.grid for val in row
-            if val == Map.THIN_ICE.value
-        )
-        thick = sum(
-            1 for row in self.grid for val in row
-            if val == Map.THICK_ICE.value
-        )
-        bags = len(self.coin_bags)
+        thin = int(np.count_nonzero(self.grid == Map.THIN_ICE.value))
+        thick = int(np.count_nonzero(self.grid == Map.THICK_ICE.value))
+        bags = int(np.count_nonzero(self.items & Item.COIN_BAG))
         return thin + 2 * thick + 100 * bags
 
     def load_level(self) -> None:
-        """Carrega o nível atual do conjunto."""
-        _, level_path = get_level_path(self.level_folder, self.current_level_id)
-        self.grid, self.start, self.coin_bags, self.keys, self.blocks, self.teleports = get_level(self.level_folder, self.current_level_id)
+        """Carrega o nível atual do conjunto (a partir do cache de níveis já decodificados)."""
+        self.apply_template(load_level_template(self.level_folder, self.current_level_id))
 
-        self.total_tiles: int = self.compute_total_tiles()
-        self.total_points: int = self.compute_total_points()
+    def apply_template(self, template: "LevelTemplate") -> None:
+        """Restaura o estado mutável a partir de um template (cópia dos arrays de grid e itens)."""
+        self.grid = template.grid.copy()
+        self.items = template.items.copy()
+        self.start = template.start
+        # Teletransportes não são alterados durante o jogo: compartilhados com o template
+        self.teleport_cells = template.teleport_cells
+        self.teleport_exit = template.teleport_exit
+
+        self.total_tiles: int = template.total_tiles
+        self.total_points: int = template.total_points
         
 
     def load_next_level(self) -> None:
@@ -105,10 +156,137 @@ class Level:
         self.load_level()
 
 
+class LevelTemplate:
+    """Estado inicial imutável de um nível já decodificado (arrays somente leitura).
+
+    Os arrays não são copiados: podem ser fatias de um pacote mapeado em
+    memória (ver src/level_pack.py).
+    """
+
+    def __init__(self, grid, items, start, teleports, total_tiles=None, total_points=None):
+        self.grid: np.ndarray = np.asarray(grid, dtype=np.uint8)
+        self.items: np.ndarray = np.asarray(items, dtype=np.uint8)
+        self.start: Tuple[int, int] = (int(start[0]), int(start[1]))
+        self.teleport_cells, self.teleport_exit = teleport_tables(teleports)
+
+        thin = int(np.count_nonzero(self.grid == Map.THIN_ICE.value))
+        thick = int(np.count_nonzero(self.grid == Map.THICK_ICE.value))
+        bags = int(np.count_nonzero(self.items & Item.COIN_BAG))
+        # Mesmas regras de Level.compute_total_tiles / compute_total_points
+        self.total_tiles: int = thin + 2 * thick + (1 if len(self.teleport_cells) else 0) \
+            if total_tiles is None else int(total_tiles)
+        self.total_points: int = thin + 2 * thick + 100 * bags if total_points is None else int(total_points)
+
+        for array in (self.grid, self.items, self.teleport_cells, self.teleport_exit):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_parsed(cls, grid, start, coin_bags, keys, blocks, teleports) -> "LevelTemplate":
+        """Monta o template a partir da saída de get_level (listas de posições dos itens)."""
+        items = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        for item, positions in ((Item.COIN_BAG, coin_bags), (Item.KEY, keys), (Item.BLOCK, blocks)):
+            for x, y in positions:
+                items[y, x] |= item
+        return cls(grid, items, start, teleports)
+
+    def __reduce__(self):
+        # Reconstrói via __init__ para que a cópia (ex.: vinda de outro processo) continue somente leitura
+        return (LevelTemplate, (self.grid, self.items, self.start, self.teleport_cells,
+                                self.total_tiles, self.total_points))
+
+    @property
+    def teleports(self) -> List[Tuple[int, int]]:
+        return [(int(x), int(y)) for x, y in self.teleport_cells]
+
+    def item_positions(self, item: Item) -> List[Tuple[int, int]]:
+        ys, xs = np.nonzero(self.items & item)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+
+def teleport_tables(positions: Iterable[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Monta (posições, saída por célula) dos teletransportes; pares 0-1, 2-3, ..."""
+    cells = np.array(list(positions), dtype=np.int16).reshape(-1, 2)
+    exits = np.full((GRID_HEIGHT, GRID_WIDTH, 2), -1, dtype=np.int16)
+    for i, (x, y) in enumerate(cells):
+        if (i ^ 1) < len(cells):
+            exits[y, x] = cells[i ^ 1]
+    return cells, exits
+
+
+# Cache de níveis decodificados, invalidado quando o mtime do arquivo (ou da pasta) muda
+_TEMPLATE_CACHE: Dict[str, Tuple[Tuple[int, int], LevelTemplate]] = {}
+_LEVEL_COUNT_CACHE: Dict[str, Tuple[int, int]] = {}
+
+# Conjuntos de níveis que não vêm de data/levels/<folder>/*.txt (pacotes binários, listas em memória).
+# Qualquer sequência de LevelTemplate serve: precisa de len() e indexação.
+_LEVEL_SOURCES: Dict[str, Sequence[LevelTemplate]] = {}
+
+
+def register_level_source(folder: str, templates: Sequence[LevelTemplate]) -> None:
+    """Faz `Level(folder)` (e quem usa load_level_template) ler os níveis de `templates`."""
+    _LEVEL_SOURCES[folder] = templates
+
+
+def unregister_level_source(folder: str) -> None:
+    _LEVEL_SOURCES.pop(folder, None)
+
+
+def levels_dir(folder: str) -> str:
+    """Diretório data/levels/<folder>, sem criá-lo."""
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    return os.path.join(repo_root, "data", "levels", folder)
+
+
+def load_level_template(folder: str, index: int) -> LevelTemplate:
+    """Retorna o template do nível, lendo e decodificando o arquivo só na primeira vez (ou se ele mudar)."""
+    source = _LEVEL_SOURCES.get(folder)
+    if source is not None:
+        return source[index]
+
+    path = os.path.join(levels_dir(folder), f"level_{index:04}.txt")
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _TEMPLATE_CACHE.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    template = LevelTemplate.from_parsed(*get_level(folder, index))
+    _TEMPLATE_CACHE[path] = (version, template)
+    return template
+
+
+def count_levels(folder: str) -> int:
+    """Quantidade de arquivos level_*.txt na pasta; só relista quando o mtime da pasta muda."""
+    source = _LEVEL_SOURCES.get(folder)
+    if source is not None:
+        return len(source)
+
+    output_dir = levels_dir(folder)
+    os.makedirs(output_dir, exist_ok=True)
+    mtime = os.stat(output_dir).st_mtime_ns
+    cached = _LEVEL_COUNT_CACHE.get(output_dir)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    count = sum(1 for f in os.listdir(output_dir) if f.endswith(".txt") and f.startswith("level_"))
+    _LEVEL_COUNT_CACHE[output_dir] = (mtime, count)
+    return count
+
+
+def clear_level_cache() -> None:
+    _TEMPLATE_CACHE.clear()
+    _LEVEL_COUNT_CACHE.clear()
+
+
+# Tabela ASCII -> valor do tile, usada para decodificar as linhas do grid
+_CHAR_TO_TILE = np.full(256, Map.EMPTY.value, dtype=np.uint8)
+for _char, _map_enum in char_to_level_map.items():
+    _CHAR_TO_TILE[ord(_char)] = _map_enum.value
+
+
 def get_level_path(folder: str, index: int) -> Tuple[str, str]:
     """Retorna o caminho do diretório e do arquivo do nível."""
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    output_dir = os.path.join(repo_root, "data", "levels", folder)  # Ensure this is a string, not a list
+    output_dir = levels_dir(folder)
     os.makedirs(output_dir, exist_ok=True)  # Create directory if not exists
     path = os.path.join(output_dir, f"level_{index:04}.txt")
     return output_dir, path
@@ -131,6 +309,7 @@ def encode_levels_to_txt(folder, index, grid, start, coin_bags, keys, blocks, te
             for i, row in enumerate(grid):
                 line = ""
                 for j, val in enumerate(row):
+                    val = int(val)
                     coord = (j, i)
                     if coord == start:
                         line += 'A'
@@ -147,7 +326,7 @@ def encode_levels_to_txt(folder, index, grid, start, coin_bags, keys, blocks, te
                         else:
                             line += level_map_to_char.get(Map(val), '0')
                     elif coord in blocks:
-                        line += '6'
+                        line += 'E' if val == Map.THICK_ICE.value else '6'
                     else:
                         line += level_map_to_char.get(Map(val), '0')
                 f.write(line + "\n")
@@ -187,13 +366,10 @@ def get_level(folder, index):
                 break
 
         grid_lines = [line.strip() for line in [line] + f.readlines()]
-        grid = []
-        for i, line in enumerate(grid_lines):
-            row = []
-            for j, char in enumerate(line):
-                map_enum = char_to_level_map.get(char, Map.EMPTY)
-                row.append(map_enum.value)
-            grid.append(row)
+        grid = np.full((GRID_HEIGHT, GRID_WIDTH), Map.EMPTY.value, dtype=np.uint8)
+        for i, line in enumerate(grid_lines[:GRID_HEIGHT]):
+            chars = np.frombuffer(line[:GRID_WIDTH].encode("ascii", "replace"), dtype=np.uint8)
+            grid[i, :len(chars)] = _CHAR_TO_TILE[chars]
 
         #return Level(grid, start, coin_bags, keys, blocks, teleports, total_tiles)
         return grid, start, coin_bags, keys, blocks, teleports
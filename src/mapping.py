@@ -1,4 +1,6 @@
-from enum import Enum
+from enum import Enum, IntFlag
+
+import numpy as np
 
 
 GRID_HEIGHT = 15
@@ -18,6 +20,20 @@ class Map(Enum):
     COIN_BAG = 9
     BLOCK = 10
 
+class Item(IntFlag):
+    """Bits do plano de itens (`Level.items`), sobrepostos ao tile de cada célula."""
+    NONE = 0
+    COIN_BAG = 1
+    KEY = 2
+    BLOCK = 4
+
+# Tabelas de consulta indexadas pelo valor do tile (Map.value)
+BLOCKING_TILES = np.zeros(len(Map), dtype=bool)  # barram o jogador e os blocos
+BLOCKING_TILES[[Map.WALL.value, Map.LOCK.value, Map.WATER.value]] = True
+
+SOLID_TILES = np.zeros(len(Map), dtype=bool)  # intransponíveis mesmo com chave
+SOLID_TILES[[Map.WALL.value, Map.WATER.value]] = True
+
 char_to_level_map = {
     '0': Map.EMPTY,
     '1': Map.WALL,
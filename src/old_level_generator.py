@@ -1,27 +1,59 @@
+import copy
+import os
 import random
+import threading
 import numpy as np
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple
 
-from src.mapping import Map
-from src.levels import Level, encode_levels_to_txt
+from src.mapping import Map, Item
+from src.levels import Level, LevelTemplate, encode_levels_to_txt, register_level_source
+from src.solver import SolvabilityFilter
 
 
 class LevelGenerator:
     GRID_HEIGHT = 15
     GRID_LENGTH = 19
     MAX_ATTEMPTS = 20
+    MAX_RETRIES = 50  # chamadas a generate_level (cada uma com MAX_ATTEMPTS) antes de desistir de um índice
 
-    def __init__(self, mean_steps: int, std_steps: float = 0.2, teleport_prob: float = 0.0):
+    def __init__(self, mean_steps: int, std_steps: float = 0.2, teleport_prob: float = 0.0,
+                 verifier: Optional[SolvabilityFilter] = None):
         self.mean_steps = mean_steps
         self.std_steps = max(1, int(std_steps * mean_steps))
         self.teleport_prob = teleport_prob
+        # Filtro opcional de solubilidade: fases rejeitadas contam como tentativa falha
+        self.verifier = verifier
+        # Fontes de aleatoriedade: os geradores globais, a menos que uma semente seja fixada (ver seeded)
+        self.rng = random
+        self.np_rng = np.random
+
+    def seeded(self, seed: int, index: int = 0) -> "LevelGenerator":
+        """Cópia deste gerador com RNGs próprios, derivados de (semente mestre, índice do nível)."""
+        clone = copy.copy(self)
+        state = np.random.SeedSequence([seed, index])
+        clone.rng = random.Random(int(state.generate_state(1, np.uint64)[0]))
+        clone.np_rng = np.random.default_rng(state)
+        return clone
+
+    def __getstate__(self):
+        # Os RNGs não vão para os processos do pool: cada tarefa cria os seus com seeded()
+        state = self.__dict__.copy()
+        state.pop("rng", None)
+        state.pop("np_rng", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.rng = random
+        self.np_rng = np.random
 
     def maybe_create_teleport(self, grid, cy, cx, steps, max_steps, teleports) -> Tuple[bool, int, int]:
         if not teleports or steps <= 3 or steps >= max_steps - 3:
             return False, cy, cx
 
         prob = 1 - (1 - self.teleport_prob) ** (1 / (max_steps - 6))
-        if random.random() > prob:
+        if self.rng.random() > prob:
             return False, cy, cx
 
         candidates = [(y, x) for y in range(1, self.GRID_HEIGHT - 1)
@@ -31,7 +63,7 @@ class LevelGenerator:
         if not candidates:
             return False, cy, cx
 
-        ny, nx = random.choice(candidates)
+        ny, nx = self.rng.choice(candidates)
         grid[cy][cx] = Map.TELEPORT.value
         teleports.append((cx, cy))
         grid[ny][nx] = Map.TELEPORT.value
@@ -47,19 +79,19 @@ class LevelGenerator:
                    if grid[y][x] in (Map.THIN_ICE.value, Map.THICK_ICE.value)
                    and (x, y) != (sx, sy)
         ]
-        return [random.choice(valid_cells)] if valid_cells else []
+        return [self.rng.choice(valid_cells)] if valid_cells else []
 
     def _random_walk(self, use_uniform=False) -> Tuple[List[List[int]], Tuple[int, int], int]:
         grid = [[Map.WALL.value for _ in range(self.GRID_LENGTH)] for _ in range(self.GRID_HEIGHT)]
-        fy, fx = random.randint(0, self.GRID_HEIGHT - 1), random.randint(0, self.GRID_LENGTH - 1)
+        fy, fx = self.rng.randint(0, self.GRID_HEIGHT - 1), self.rng.randint(0, self.GRID_LENGTH - 1)
         grid[fy][fx] = Map.FINISH.value
 
         cy, cx = fy, fx
         steps = 0
         teleports = []
 
-        max_steps = random.randint(1, self.mean_steps) if use_uniform else int(np.clip(
-            np.random.normal(self.mean_steps, self.std_steps), 1, 300))
+        max_steps = self.rng.randint(1, self.mean_steps) if use_uniform else int(np.clip(
+            self.np_rng.normal(self.mean_steps, self.std_steps), 1, 300))
 
         while steps < max_steps:
             created, cy, cx = self.maybe_create_teleport(grid, cy, cx, steps, max_steps, teleports)
@@ -79,13 +111,13 @@ class LevelGenerator:
 
                 if tile == Map.WALL.value:
                     options.append((ny, nx, 'thin'))
-                elif tile == Map.THIN_ICE.value and random.random():
+                elif tile == Map.THIN_ICE.value and self.rng.random():
                     options.append((ny, nx, 'thick'))
 
             if not options:
                 break
 
-            ny, nx, action = random.choice(options)
+            ny, nx, action = self.rng.choice(options)
             if action == 'thin':
                 grid[ny][nx] = Map.THIN_ICE.value
             elif action == 'thick':
@@ -97,9 +129,9 @@ class LevelGenerator:
         start = (cx, cy)
         return grid, start, self.add_coin_bags(grid, start), [], [], teleports, steps
 
-    def generate_valid_level(self, idx: int, use_uniform: bool, output_folder: str) -> bool:
+    def generate_level(self, use_uniform: bool) -> Optional[LevelTemplate]:
         """
-        Tenta gerar um nível válido e salvá-lo. Retorna True se teve sucesso.
+        Tenta gerar um nível válido em memória. Retorna None se falhar após MAX_ATTEMPTS.
         """
         for _ in range(self.MAX_ATTEMPTS):
             grid, start, coin_bags, keys, blocks, teleports, steps = self._random_walk(use_uniform)
@@ -111,24 +143,125 @@ class LevelGenerator:
             if grid[sy][sx] == Map.THICK_ICE.value:
                 continue
 
-            # Nível considerado válido → salva
-            encode_levels_to_txt(
-                output_folder,
-                idx,
-                grid,
-                start,
-                coin_bags,
-                keys,
-                blocks,
-                teleports,
-                steps
-            )
-            return True  # sucesso
-        return False  # falhou após MAX_ATTEMPTS
-
-
-    def build_random_levels(self, total_levels: int, output_folder=None) -> str:
+            level = LevelTemplate.from_parsed(grid, start, coin_bags, keys, blocks, teleports)
+            if self.verifier is not None and not self.verifier.accept(level):
+                continue
+            return level
+        return None
+
+    def generate_valid_level(self, idx: int, use_uniform: bool, output_folder: str) -> bool:
+        """
+        Tenta gerar um nível válido e salvá-lo. Retorna True se teve sucesso.
+        """
+        level = self.generate_level(use_uniform)
+        if level is None:
+            return False  # falhou após MAX_ATTEMPTS
+
+        encode_levels_to_txt(
+            output_folder,
+            idx,
+            level.grid,
+            level.start,
+            level.item_positions(Item.COIN_BAG),
+            level.item_positions(Item.KEY),
+            level.item_positions(Item.BLOCK),
+            level.teleports,
+            level.total_tiles
+        )
+        return True  # sucesso
+
+    def _uniform_flags(self, total_levels: int, seed: Optional[int] = None) -> List[bool]:
+        # Metade dos níveis (em posições sorteadas) usa passos uniformes, como em build_random_levels
+        indices = list(range(total_levels))
+        (self.rng if seed is None else random.Random(seed)).shuffle(indices)
+        flags = [False] * total_levels
+        for idx_pos, idx in enumerate(indices):
+            flags[idx] = idx_pos >= total_levels // 2
+        return flags
+
+    def generate_indexed_level(self, idx: int, use_uniform: bool, seed: int) -> LevelTemplate:
+        """
+        Gera o nível `idx` com RNG derivado de (seed, idx): o resultado não depende
+        de quais outros níveis foram gerados antes nem em qual processo.
+        """
+        return self.seeded(seed, idx).generate_level_or_raise(use_uniform)
+
+    def generate_level_or_raise(self, use_uniform: bool) -> LevelTemplate:
+        """
+        Repete generate_level até MAX_RETRIES vezes; se o filtro rejeitar tudo
+        (ex.: mean_steps extremo), levanta RuntimeError em vez de travar.
+        """
+        for _ in range(self.MAX_RETRIES):
+            level = self.generate_level(use_uniform)
+            if level is not None:
+                return level
+        raise RuntimeError(
+            f"Nenhum nível válido após {self.MAX_RETRIES * self.MAX_ATTEMPTS} tentativas "
+            f"(mean_steps={self.mean_steps}, uniforme={use_uniform})"
+        )
+
+    def generate_levels(self, total_levels: int, seed: Optional[int] = None,
+                        workers: Optional[int] = 1) -> List[LevelTemplate]:
+        """
+        Gera `total_levels` níveis em memória, na ordem dos índices.
+
+        Com `workers` > 1 (None = todos os núcleos) os níveis são distribuídos
+        em um pool de processos. Com `seed` a saída é reprodutível e idêntica
+        para qualquer número de workers; sem semente, uma é sorteada do RNG
+        atual. A reprodutibilidade só vale com um `verifier` sem `time_limit`:
+        com limite de tempo, o veredito (e os sorteios gastos em rejeições)
+        depende da velocidade da máquina.
+        """
+        workers = workers or os.cpu_count() or 1
+        if seed is None:
+            if workers == 1:
+                return list(self.iter_random_levels(total_levels))
+            seed = self.rng.randrange(2 ** 32)
+
+        flags = self._uniform_flags(total_levels, seed)
+        if workers == 1:
+            return [self.generate_indexed_level(idx, flag, seed) for idx, flag in enumerate(flags)]
+
+        chunksize = max(1, total_levels // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                self._generate_indexed_counted, range(total_levels), flags, [seed] * total_levels,
+                chunksize=chunksize,
+            ))
+        if self.verifier is not None:
+            for _, stats, cache_entries in results:
+                self.verifier.merge_stats(stats)
+                self.verifier.merge_cache(cache_entries)
+        return [level for level, _, _ in results]
+
+    def _generate_indexed_counted(self, idx: int, use_uniform: bool, seed: int):
+        # Roda num processo do pool: devolve também os contadores e as entradas
+        # novas do cache do filtro, para somar no pai
+        if self.verifier is None:
+            return self.generate_indexed_level(idx, use_uniform, seed), None, None
+        self.verifier.reset_stats()
+        known = len(self.verifier.cache)
+        level = self.generate_indexed_level(idx, use_uniform, seed)
+        return level, self.verifier.stats, self.verifier.new_cache_entries(known)
+
+    def build_random_levels(self, total_levels: int, output_folder=None,
+                            seed: Optional[int] = None, workers: Optional[int] = 1) -> str:
         output_folder = output_folder or f"mean_{self.mean_steps:04}"
+        if seed is not None or workers != 1:
+            for idx, level in enumerate(self.generate_levels(total_levels, seed, workers)):
+                encode_levels_to_txt(
+                    output_folder,
+                    idx,
+                    level.grid,
+                    level.start,
+                    level.item_positions(Item.COIN_BAG),
+                    level.item_positions(Item.KEY),
+                    level.item_positions(Item.BLOCK),
+                    level.teleports,
+                    level.total_tiles
+                )
+            return output_folder
+
         indices = list(range(total_levels))
         random.shuffle(indices)
 
@@ -143,4 +276,75 @@ class LevelGenerator:
 
         return output_folder
 
+    # ---------- Geração em memória ----------
+
+    def iter_random_levels(self, total_levels: int, seed: Optional[int] = None) -> Iterator[LevelTemplate]:
+        """Gera `total_levels` níveis em memória, na ordem dos índices, sem tocar o disco.
+
+        Índices cuja geração falha são sorteados de novo, então a sequência
+        sempre tem exatamente `total_levels` níveis (sem buracos). Com `seed`,
+        produz os mesmos níveis que generate_levels(total_levels, seed).
+        """
+        for idx, use_uniform in enumerate(self._uniform_flags(total_levels, seed)):
+            if seed is not None:
+                yield self.generate_indexed_level(idx, use_uniform, seed)
+                continue
+            yield self.generate_level_or_raise(use_uniform)
+
+    def build_levels_in_memory(self, total_levels: int, extra_levels: int = 0,
+                               folder: Optional[str] = None, persist_path: Optional[str] = None,
+                               seed: Optional[int] = None, workers: Optional[int] = 1) -> str:
+        """Registra um conjunto de níveis gerados em memória e retorna seu nome de pasta.
+
+        O ambiente lê os níveis direto da memória (via `Level(folder)`). Com um
+        único worker cada nível só é gerado quando pedido pela primeira vez,
+        intercalando geração e treino; com vários, o conjunto é gerado de uma
+        vez no pool de processos (ver generate_levels). Com `persist_path`, uma
+        thread grava o conjunto completo em um pacote binário
+        (src/level_pack.py) para reprodutibilidade.
+        """
+        folder = folder or f"mean_{self.mean_steps:04}"
+        total = total_levels + extra_levels
+        if workers == 1:
+            stream = self.iter_random_levels(total, seed)
+        else:
+            stream = iter(self.generate_levels(total, seed, workers))
+        levels = GeneratedLevels(stream, total)
+        register_level_source(folder, levels)
+        if persist_path:
+            levels.persist_async(persist_path)
+        return folder
+
+
+class GeneratedLevels(Sequence):
+    """Sequência de níveis materializada preguiçosamente a partir de um iterador."""
+
+    def __init__(self, stream: Iterator[LevelTemplate], total_levels: int):
+        self._stream = stream
+        self._levels: List[LevelTemplate] = []
+        self._total = total_levels
+        self._lock = threading.Lock()
+        self.persist_thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __getitem__(self, index: int) -> LevelTemplate:
+        if not -self._total <= index < self._total:
+            raise IndexError(index)
+        index %= self._total
+        with self._lock:
+            while len(self._levels) <= index:
+                self._levels.append(next(self._stream))
+            return self._levels[index]
+
+    def persist_async(self, path: str) -> threading.Thread:
+        """Gera o que faltar e grava tudo em `path` numa thread em segundo plano."""
+        from src.level_pack import write_level_pack
+
+        def _persist():
+            write_level_pack(path, [self[i] for i in range(self._total)])
 
+        self.persist_thread = threading.Thread(target=_persist, daemon=True)
+        self.persist_thread.start()
+        return self.persist_thread
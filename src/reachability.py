@@ -0,0 +1,183 @@
+# /src/reachability.py
+
+from collections import deque
+from typing import Iterable, List, Tuple
+
+from src.mapping import Map, SOLID_TILES, GRID_HEIGHT, GRID_WIDTH
+
+CELLS = GRID_HEIGHT * GRID_WIDTH
+
+# Vizinhos 4-conectados de cada célula, em índices achatados (y * W + x)
+NEIGHBOURS: List[Tuple[int, ...]] = []
+for _y in range(GRID_HEIGHT):
+    for _x in range(GRID_WIDTH):
+        NEIGHBOURS.append(tuple(
+            (_y + dy) * GRID_WIDTH + (_x + dx)
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1))
+            if 0 <= _x + dx < GRID_WIDTH and 0 <= _y + dy < GRID_HEIGHT
+        ))
+
+
+def teleport_links(teleports: List[Tuple[int, int]]) -> dict:
+    """Mapeia cada teletransporte (índice achatado) ao seu par, como em ThinIceEnv (pares 0-1, 2-3...)."""
+    links = {}
+    if len(teleports) % 2 == 0:
+        for i in range(0, len(teleports), 2):
+            (ax, ay), (bx, by) = teleports[i], teleports[i + 1]
+            a, b = ay * GRID_WIDTH + ax, by * GRID_WIDTH + bx
+            links[a] = b
+            links[b] = a
+    return links
+
+
+def _flat_tiles(grid):
+    """Converte o grid (array ou lista de listas) em uma lista achatada de ints."""
+    if hasattr(grid, "ravel"):
+        return grid.ravel().tolist()
+    return [val for row in grid for val in row]
+
+
+def all_ice_reachable(grid, teleports: List[Tuple[int, int]], start: Tuple[int, int]) -> bool:
+    """BFS sem estado: todo gelo (fino ou grosso) é alcançável a partir de `start`?
+
+    Paredes e água bloqueiam; blocos e trancas não. Usa a tabela de vizinhos
+    pré-calculada e para assim que todo o gelo foi encontrado.
+    """
+    tiles = _flat_tiles(grid)
+    ice = (Map.THIN_ICE.value, Map.THICK_ICE.value)
+    remaining = sum(1 for val in tiles if val in ice)
+    links = teleport_links(teleports)
+
+    source = start[1] * GRID_WIDTH + start[0]
+    visited = bytearray(CELLS)
+    visited[source] = 1
+    queue = deque([source])
+    while queue and remaining:
+        cell = queue.popleft()
+        if tiles[cell] in ice:
+            remaining -= 1
+        for nxt in NEIGHBOURS[cell]:
+            if not visited[nxt] and not SOLID_TILES[tiles[nxt]]:
+                visited[nxt] = 1
+                queue.append(nxt)
+        partner = links.get(cell)
+        if partner is not None and not visited[partner]:
+            visited[partner] = 1
+            queue.append(partner)
+    return remaining == 0
+
+
+class ReachabilityTracker:
+    """Componentes conexas do grid mantidas incrementalmente para um Game.
+
+    Gelo só vira água, então as componentes só se dividem: quando uma célula
+    fica intransponível, apenas a componente dela é revisitada, e só até
+    reencontrar os vizinhos da célula removida. A consulta
+    `all_ice_reachable()` é O(1) e tem a mesma semântica do BFS de
+    ThinIceEnv. `update()` deve ser chamado a cada passo, antes de
+    `Game.clear_dirty()`.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self._level_version = None
+
+    def rebuild(self):
+        level = self.game.level
+        tiles = _flat_tiles(level.grid)
+        self.links = teleport_links(level.teleports)
+        self.passable = bytearray(0 if SOLID_TILES[val] else 1 for val in tiles)
+        self.ice = bytearray(1 if val in (Map.THIN_ICE.value, Map.THICK_ICE.value) else 0 for val in tiles)
+        self.total_ice = sum(self.ice)
+
+        self.label = [-1] * CELLS
+        self.ice_count = {}
+        self._next_label = 0
+        for cell in range(CELLS):
+            if self.passable[cell] and self.label[cell] < 0:
+                component = self._explore(cell, -1)
+                self._assign(component, self._new_label())
+        self._level_version = self.game.level_version
+
+    def _new_label(self) -> int:
+        self._next_label += 1
+        return self._next_label - 1
+
+    def _adjacent(self, cell: int) -> Iterable[int]:
+        yield from NEIGHBOURS[cell]
+        partner = self.links.get(cell)
+        if partner is not None:
+            yield partner
+
+    def _explore(self, source: int, label: int, targets=None) -> set:
+        """Células com `label` ligadas a `source`; para cedo se encontrar todos os `targets`."""
+        seen = {source}
+        queue = deque([source])
+        missing = set(targets) - seen if targets else None
+        while queue:
+            cell = queue.popleft()
+            for nxt in self._adjacent(cell):
+                if nxt not in seen and self.passable[nxt] and self.label[nxt] == label:
+                    seen.add(nxt)
+                    queue.append(nxt)
+                    if missing is not None:
+                        missing.discard(nxt)
+                        if not missing:
+                            return seen
+        return seen
+
+    def _assign(self, component: set, label: int) -> None:
+        for cell in component:
+            self.label[cell] = label
+        self.ice_count[label] = sum(self.ice[cell] for cell in component)
+
+    def _remove(self, cell: int) -> None:
+        """Torna a célula intransponível e divide sua componente se necessário."""
+        old = self.label[cell]
+        self.label[cell] = -1
+        self.passable[cell] = 0
+
+        pending = {nxt for nxt in self._adjacent(cell) if self.passable[nxt] and self.label[nxt] == old}
+        while len(pending) > 1:
+            source = pending.pop()
+            seen = self._explore(source, old, targets=pending)
+            if pending <= seen:
+                break  # os vizinhos restantes continuam ligados a `source`
+            # `seen` é uma componente inteira que se desligou das demais
+            new = self._new_label()
+            self._assign(seen, new)
+            self.ice_count[old] -= self.ice_count[new]
+            pending -= seen
+
+    def update(self):
+        """Aplica as células sujas do Game (ou reconstrói tudo após carregar uma fase)."""
+        game = self.game
+        if self._level_version != game.level_version:
+            self.rebuild()
+            return
+
+        grid = game.level.grid
+        for x, y in set(game.dirty_cells):
+            cell = y * GRID_WIDTH + x
+            tile = grid[y, x]
+            is_ice = 1 if tile in (Map.THIN_ICE.value, Map.THICK_ICE.value) else 0
+            if is_ice != self.ice[cell]:
+                delta = is_ice - self.ice[cell]
+                self.ice[cell] = is_ice
+                self.total_ice += delta
+                if self.label[cell] >= 0:
+                    self.ice_count[self.label[cell]] += delta
+
+            if self.passable[cell] and SOLID_TILES[tile]:
+                self._remove(cell)
+            elif not self.passable[cell] and not SOLID_TILES[tile]:
+                self.rebuild()  # célula reaberta: não acontece nas regras atuais
+                return
+
+    def all_ice_reachable(self) -> bool:
+        self.update()
+        cell = self.game.player_y * GRID_WIDTH + self.game.player_x
+        label = self.label[cell]
+        if label < 0:
+            return self.total_ice == 0
+        return self.ice_count[label] == self.total_ice
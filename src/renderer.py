@@ -0,0 +1,77 @@
+# src/renderer.py
+#
+# Renderização sem pygame: quadros RGB montados direto da grade com NumPy.
+# Cada célula vira um índice em um atlas de sprites pré-calculado (tile x
+# sobreposição) e o quadro inteiro sai de uma única indexação, em lote para
+# N partidas. Não abre janela nem inicializa o display, então serve para
+# gravar vídeos de avaliação em servidores sem tela.
+
+import numpy as np
+
+from src.mapping import Map, Item, GRID_HEIGHT, GRID_WIDTH, CELL_SIZE, color_map
+
+PLAYER_COLOR = (254, 2, 0)  # mesma cor de draw_game_screen
+
+# Sobreposições desenhadas por cima do tile, na ordem de prioridade de draw_game_screen
+NO_OVERLAY, COIN_OVERLAY, KEY_OVERLAY, BLOCK_OVERLAY, PLAYER_OVERLAY = range(5)
+N_OVERLAYS = 5
+N_TILES = len(Map)
+
+
+def build_atlas(cell_size=CELL_SIZE):
+    """Atlas (N_OVERLAYS * N_TILES, cell_size, cell_size, 3) uint8, índice = sobreposição * N_TILES + tile."""
+    atlas = np.empty((N_OVERLAYS, N_TILES, cell_size, cell_size, 3), dtype=np.uint8)
+    atlas[:] = np.array(color_map[:N_TILES], dtype=np.uint8)[None, :, None, None, :]
+
+    # Moedas e chaves: círculo de raio 3/8 da célula, como em draw_game_screen
+    center = cell_size / 2
+    pixel = np.arange(cell_size) + 0.5
+    circle = (pixel[:, None] - center) ** 2 + (pixel[None, :] - center) ** 2 <= (cell_size * 3 / 8) ** 2
+    atlas[COIN_OVERLAY][:, circle] = color_map[Map.COIN_BAG.value]
+    atlas[KEY_OVERLAY][:, circle] = color_map[Map.LOCK.value]
+    atlas[BLOCK_OVERLAY] = color_map[Map.BLOCK.value]
+    atlas[PLAYER_OVERLAY] = PLAYER_COLOR
+    return atlas.reshape(N_OVERLAYS * N_TILES, cell_size, cell_size, 3)
+
+
+class FrameRenderer:
+    """Quadros RGB (H*cell, W*cell, 3) de partidas de Thin Ice, sem pygame.
+
+    `render(grid, items, player_x, player_y)` aceita uma partida (grade 2D,
+    jogador escalar) ou um lote (grades (N, 15, 19), jogadores (N,)) e devolve
+    `(15*cell, 19*cell, 3)` ou `(N, 15*cell, 19*cell, 3)`. Só o tabuleiro é
+    desenhado; o HUD de texto continua em draw_game_screen.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.atlas = build_atlas(cell_size)
+
+    def codes(self, grid, items, player_x, player_y):
+        """Índice do atlas por célula, (N, 15, 19)."""
+        items = np.asarray(items)
+        overlay = np.where(items & Item.BLOCK, BLOCK_OVERLAY,
+                           np.where(items & Item.KEY, KEY_OVERLAY,
+                                    np.where(items & Item.COIN_BAG, COIN_OVERLAY, NO_OVERLAY)))
+        overlay[np.arange(len(overlay)), player_y, player_x] = PLAYER_OVERLAY
+        return overlay * N_TILES + grid
+
+    def render(self, grid, items, player_x, player_y):
+        grid = np.asarray(grid)
+        single = grid.ndim == 2
+        if single:
+            grid, items = grid[None], np.asarray(items)[None]
+        codes = self.codes(grid, items, np.atleast_1d(player_x), np.atleast_1d(player_y))
+
+        n, cell = len(codes), self.cell_size
+        tiles = self.atlas.take(codes, axis=0)  # (N, 15, 19, cell, cell, 3)
+        frames = tiles.transpose(0, 1, 3, 2, 4, 5).reshape(n, GRID_HEIGHT * cell, GRID_WIDTH * cell, 3)
+        return frames[0] if single else frames
+
+    def render_game(self, game):
+        """Quadro de um `Game`."""
+        return self.render(game.level.grid, game.level.items, game.player_x, game.player_y)
+
+    def render_batch(self, batch):
+        """Quadros de todas as partidas de um `BatchGame`."""
+        return self.render(batch.grid, batch.items, batch.player_x, batch.player_y)
@@ -0,0 +1,226 @@
+# src/scripts/benchmark_env.py
+#
+# Vazão do motor do jogo: passos/s e resets/s de Game e ThinIceEnv, e tempo
+# médio por fase do passo, nas fases de original_game e em fases geradas.
+# A saída é JSON; com --baseline compara com uma execução anterior e sai com
+# código 1 se alguma métrica piorar além da tolerância.
+#
+#   python -m src.scripts.benchmark_env --output bench.json
+#   python -m src.scripts.benchmark_env --baseline bench.json --tolerance 0.1
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from src.game import Game
+from src.learning.thin_ice_env import ThinIceEnv
+from src.levels import Level, count_levels
+from src.old_level_generator import LevelGenerator
+
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+# Fases do passo de ThinIceEnv. compute_reward inclui all_ice_reachable e
+# block_slide soma todas as chamadas de move_block (inclusive o primeiro
+# empurrão, feito dentro de move_player).
+PHASES = ("move_player", "block_slide", "check_progress", "get_obs", "compute_reward", "all_ice_reachable")
+
+
+class PhaseTimer:
+    """Acumula tempo (ns) e chamadas por fase."""
+
+    def __init__(self):
+        self.ns = defaultdict(int)
+        self.calls = defaultdict(int)
+
+    def wrap(self, phase, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.ns[phase] += time.perf_counter_ns() - start
+                self.calls[phase] += 1
+        return timed
+
+    def per_step_us(self, steps):
+        return {phase: self.ns[phase] / 1000 / steps for phase in PHASES if steps}
+
+
+ENV_METHODS = {"_get_obs": "get_obs", "_compute_reward": "compute_reward", "all_ice_reachable": "all_ice_reachable"}
+GAME_METHODS = {"move_player": "move_player", "move_block": "block_slide", "check_progress": "check_progress"}
+
+
+def _instrument(obj, methods, timer):
+    """Sobrepõe métodos na instância com versões cronometradas; env.step segue idêntico."""
+    for name, phase in methods.items():
+        setattr(obj, name, timer.wrap(phase, getattr(type(obj), name).__get__(obj)))
+
+
+def _uninstrument(obj, methods):
+    for name in methods:
+        obj.__dict__.pop(name, None)
+
+
+def _random_action(rng, mask):
+    valid = np.flatnonzero(mask)
+    return int(rng.choice(valid)) if len(valid) else 0
+
+
+def bench_env_level(env, folder, index, steps, resets, seed, timer=None):
+    """Passos aleatórios válidos em uma fase; volta para ela quando o jogo avança."""
+    rng = np.random.default_rng(seed)
+    options = {"level_folder": folder, "level_index": index}
+
+    start = time.perf_counter()
+    for _ in range(resets):
+        env.reset(options=options)
+    reset_time = time.perf_counter() - start
+
+    env.reset(options=options)
+    if timer is not None:
+        _instrument(env, ENV_METHODS, timer)
+        _instrument(env.game, GAME_METHODS, timer)
+    step_time = 0.0
+    for _ in range(steps):
+        action = _random_action(rng, env.action_masks())
+        start = time.perf_counter()
+        env.step(action)
+        step_time += time.perf_counter() - start
+        if env.game.level.current_level_id != index:
+            env.reset(options=options)
+            if timer is not None:
+                _instrument(env.game, GAME_METHODS, timer)  # reset cria um Game novo
+    if timer is not None:
+        _uninstrument(env, ENV_METHODS)
+    return steps / step_time, resets / reset_time
+
+
+def bench_game_level(folder, index, steps, seed):
+    """Só o motor (Game), com o mesmo laço de passo de ThinIceEnv."""
+    actions = np.random.default_rng(seed).integers(4, size=steps)
+    game = Game(level=Level(folder, current_level_id=index), perfect_score_required=False)
+    start = time.perf_counter()
+    for action in actions:
+        game.clear_dirty()
+        game.move_player(DIRECTIONS[action])
+        moving_block, block_direction = game.block_mov
+        while moving_block is not None:
+            game.move_block(moving_block, block_direction)
+            moving_block, block_direction = game.block_mov
+        game.check_progress()
+        if game.level.current_level_id != index:
+            game.level.current_level_id = index
+            game.reload_level()
+    return steps / (time.perf_counter() - start)
+
+
+def bench_suite(folder, levels, steps, resets, seed):
+    env = ThinIceEnv()
+    timer = PhaseTimer()
+    per_level = []
+    for index in levels:
+        env_sps, env_rps = bench_env_level(env, folder, index, steps, resets, seed + index)
+        bench_env_level(env, folder, index, steps, 0, seed + index, timer)  # passada cronometrada por fase
+        game_sps = bench_game_level(folder, index, steps, seed + index)
+        per_level.append({"level": index, "env_steps_per_sec": env_sps,
+                          "env_resets_per_sec": env_rps, "game_steps_per_sec": game_sps})
+
+    def harmonic(key):  # média de vazões: o tempo total é o que importa
+        return len(per_level) / sum(1.0 / entry[key] for entry in per_level)
+
+    return {
+        "levels": len(per_level),
+        "env_steps_per_sec": harmonic("env_steps_per_sec"),
+        "env_resets_per_sec": harmonic("env_resets_per_sec"),
+        "game_steps_per_sec": harmonic("game_steps_per_sec"),
+        "phase_us_per_step": timer.per_step_us(steps * len(per_level)),
+        "per_level": per_level,
+    }
+
+
+def run(args):
+    suites = {}
+    original = range(count_levels("original_game"))
+    suites["original_game"] = bench_suite("original_game", original, args.steps, args.resets, args.seed)
+    if args.generated:
+        generator = LevelGenerator(mean_steps=args.generated_mean)
+        folder = generator.build_levels_in_memory(args.generated, folder="benchmark_generated", seed=args.seed)
+        suites["generated"] = bench_suite(folder, range(args.generated), args.steps, args.resets, args.seed)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "steps_per_level": args.steps,
+            "resets_per_level": args.resets,
+            "seed": args.seed,
+        },
+        "suites": suites,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Linhas (métrica, base, atual, razão, regressão?) das métricas comuns às duas execuções."""
+    rows = []
+    for name, suite in current["suites"].items():
+        base = baseline["suites"].get(name)
+        if base is None:
+            continue
+        # Vazões: maior é melhor
+        for key in ("env_steps_per_sec", "env_resets_per_sec", "game_steps_per_sec"):
+            ratio = suite[key] / base[key]
+            rows.append((f"{name}.{key}", base[key], suite[key], ratio, ratio < 1 - tolerance))
+        # Tempos por fase: menor é melhor
+        for phase, value in suite["phase_us_per_step"].items():
+            old = base["phase_us_per_step"].get(phase)
+            if old:
+                ratio = old / value if value else float("inf")
+                rows.append((f"{name}.{phase}_us", old, value, ratio, ratio < 1 - tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão de Game / ThinIceEnv")
+    parser.add_argument("--steps", type=int, default=2000, help="passos por fase")
+    parser.add_argument("--resets", type=int, default=50, help="resets por fase")
+    parser.add_argument("--generated", type=int, default=20, help="fases geradas (0 desativa)")
+    parser.add_argument("--generated-mean", type=int, default=60, help="mean_steps das fases geradas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="grava o resultado em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="piora relativa tolerada")
+    args = parser.parse_args()
+
+    result = run(args)
+    for name, suite in result["suites"].items():
+        phases = ", ".join(f"{phase}={us:.1f}" for phase, us in suite["phase_us_per_step"].items())
+        print(f"[{name}] {suite['levels']} fases | env {suite['env_steps_per_sec']:.0f} passos/s, "
+              f"{suite['env_resets_per_sec']:.0f} resets/s | game {suite['game_steps_per_sec']:.0f} passos/s")
+        print(f"    µs/passo: {phases}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"[✓] Resultado gravado em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(result, baseline, args.tolerance)
+        regressions = [row for row in rows if row[4]]
+        for metric, old, new, ratio, regressed in rows:
+            flag = "  ← REGRESSÃO" if regressed else ""
+            print(f"    {metric:<45}{old:>12.2f}{new:>12.2f}{ratio:>8.2f}x{flag}")
+        if regressions:
+            print(f"[x] {len(regressions)} métricas pioraram mais de {args.tolerance:.0%}")
+            sys.exit(1)
+        print("[✓] Sem regressões em relação à base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# src/scripts/benchmark_inference.py
+#
+# Vazão de forward da CnnQNet nas variantes de inferência do DQNAgent (fp32,
+# channels-last, autocast bf16, TorchScript, torch.compile) e concordância
+# dos Q-values com a referência fp32.
+#
+#   python -m src.scripts.benchmark_inference --batches 1 32 256
+
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from src.agents.dqn_agent import DQNAgent
+from src.learning.vector_thin_ice_env import VectorThinIceEnv
+
+VARIANTS = {
+    "fp32": {},
+    "channels_last": {"channels_last": True},
+    "bf16": {"bf16": True},
+    "bf16+cl": {"bf16": True, "channels_last": True},
+    "trace": {"compile_mode": "trace"},
+    "trace+bf16": {"compile_mode": "trace", "bf16": True},
+    "compile": {"compile_mode": "compile"},
+    "compile+bf16": {"compile_mode": "compile", "bf16": True},
+}
+
+
+def observations(count, level_folder, seed):
+    """Observações reais: VectorThinIceEnv com ações aleatórias válidas."""
+    rng = np.random.default_rng(seed)
+    env = VectorThinIceEnv(min(count, 64), level_folder=level_folder, max_steps=200)
+    obs, _ = env.reset()
+    out = []
+    while sum(len(o) for o in out) < count:
+        masks = env.action_masks()
+        obs, *_ = env.step((rng.random(masks.shape) * masks).argmax(axis=1))
+        out.append(obs)
+    return torch.from_numpy(np.concatenate(out)[:count])
+
+
+def bench(agent, x, iterations):
+    agent._infer(agent._policy_infer, x)  # aquecimento (e compilação)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        agent._infer(agent._policy_infer, x)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão e concordância das variantes de inferência da CnnQNet")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 32, 256])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument("--folder", default="original_game")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    torch.manual_seed(args.seed)
+    x = observations(max(args.batches), args.folder, args.seed)
+    reference = DQNAgent((10, 15, 19), 4, device="cpu", buffer_size=1)
+    reference.policy_net.eval()
+    state = reference.policy_net.state_dict()
+    q_ref = reference._infer(reference.policy_net, x)
+
+    header = "".join(f"{f'fwd/s b={b}':>14}" for b in args.batches)
+    print(f"{'variante':<14}{header}{'max |ΔQ|':>12}{'argmax =':>10}")
+    for name in args.variants:
+        agent = DQNAgent((10, 15, 19), 4, device="cpu", buffer_size=1, **VARIANTS[name])
+        agent.policy_net.load_state_dict(state)
+        agent.policy_net.eval()
+        rates = "".join(f"{b / bench(agent, x[:b], args.iterations):>14.0f}" for b in args.batches)
+        q = agent._infer(agent._policy_infer, x)
+        diff = (q - q_ref).abs().max().item()
+        agree = (q.argmax(1) == q_ref.argmax(1)).float().mean().item()
+        print(f"{name:<14}{rates}{diff:>12.4f}{agree:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
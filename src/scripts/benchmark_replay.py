@@ -0,0 +1,77 @@
+# src/scripts/benchmark_replay.py
+#
+# Compara o ReplayBuffer com observações cruas (uint8) e empacotadas em bits:
+# memória por transição e vazão de amostragem/decodificação. As transições vêm
+# de VectorThinIceEnv com ações aleatórias válidas.
+#
+#   python -m src.scripts.benchmark_replay --transitions 200000 --batch 128
+
+import argparse
+import time
+
+import numpy as np
+
+from src.agents.replay_buffer import ReplayBuffer
+from src.learning.vector_thin_ice_env import VectorThinIceEnv
+
+
+def collect(num_envs, transitions, level_folder, seed):
+    """Gera `transitions` transições (s, a, r, s_next, done, env_id) com ações aleatórias válidas."""
+    rng = np.random.default_rng(seed)
+    env = VectorThinIceEnv(num_envs, level_folder=level_folder, max_steps=200)
+    obs, _ = env.reset()
+    out = []
+    while len(out) < transitions:
+        masks = env.action_masks()
+        scores = rng.random(masks.shape) * masks
+        actions = scores.argmax(axis=1)
+        next_obs, rewards, terminated, truncated, _ = env.step(actions)
+        done = terminated | truncated
+        # No reinício automático `next_obs` já é a do novo episódio; para medir o
+        # buffer basta que os quadros tenham o perfil real de observações
+        for i in range(num_envs):
+            out.append((obs[i], actions[i], rewards[i], next_obs[i], done[i], i))
+        obs = next_obs
+    return out[:transitions]
+
+
+def bench(transitions, packed, batch_size, iterations):
+    buffer = ReplayBuffer(len(transitions), packed=packed, pin_memory=False)
+    start = time.perf_counter()
+    for s, a, r, s_next, done, env_id in transitions:
+        buffer.add(s, a, r, s_next, done, env_id=env_id)
+    insert = len(transitions) / (time.perf_counter() - start)
+
+    buffer.sample(batch_size)  # aquecimento
+    start = time.perf_counter()
+    for _ in range(iterations):
+        buffer.sample(batch_size)
+    elapsed = time.perf_counter() - start
+    return {
+        "bytes_per_transition": buffer.nbytes() / len(buffer),
+        "insert_per_s": insert,
+        "sample_ms": 1000 * elapsed / iterations,
+        "decoded_per_s": iterations * batch_size / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória e vazão do ReplayBuffer cru x empacotado")
+    parser.add_argument("--transitions", type=int, default=100_000)
+    parser.add_argument("--envs", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=128)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--folder", default="original_game")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    transitions = collect(args.envs, args.transitions, args.folder, args.seed)
+    print(f"{'modo':<10}{'bytes/trans':>14}{'inserção/s':>14}{'sample (ms)':>14}{'decod./s':>14}")
+    for name, packed in (("uint8", False), ("packbits", True)):
+        res = bench(transitions, packed, args.batch, args.iterations)
+        print(f"{name:<10}{res['bytes_per_transition']:>14.1f}{res['insert_per_s']:>14.0f}"
+              f"{res['sample_ms']:>14.3f}{res['decoded_per_s']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
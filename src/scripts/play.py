@@ -4,7 +4,7 @@ import pygame
 import sys
 from src.levels import Level
 from src.game import Game
-from src.utils import draw_game_screen
+from src.utils import GameScreenRenderer
 
 pygame.init()
 
@@ -39,6 +39,8 @@ game = Game(
 )
 
 clock = pygame.time.Clock()
+# Redesenha só as células e textos do HUD que mudaram desde o último quadro
+renderer = GameScreenRenderer(screen, font)
 
 while True:
     for event in pygame.event.get():
@@ -46,7 +48,6 @@ while True:
             pygame.quit()
             sys.exit()
 
-    screen.fill(WHITE)
     next_level_state = game.check_progress()
 
     moving_block, block_direction = game.block_mov
@@ -64,7 +65,5 @@ while True:
             game.move_player((0, 1))
             
 
-    draw_game_screen(game, screen, font)
-    
-    pygame.display.flip()
+    pygame.display.update(renderer.draw(game))
     clock.tick(10)
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 import os
 import csv
+import json
 import matplotlib.pyplot as plt
 
 def plot_batch_summary(results, mean_steps, round_id, val_success_ratio, save_dir="plots"):
@@ -39,3 +40,21 @@ def save_round_summary_csv(round_id, batch_results, val_success_ratio, save_path
         if not file_exists:
             writer.writerow(["round", "success", "not_sufficient", "game_over", "total", "val_success_ratio"])
         writer.writerow([round_id, success, not_sufficient, game_over, total, val_success_ratio])
+
+def save_round_telemetry(record, jsonl_path="round_telemetry.jsonl", csv_path="round_telemetry.csv"):
+    with open(jsonl_path, "a") as file:
+        file.write(json.dumps(record) + "\n")
+
+    # O CSV fixa as colunas na primeira rodada (Telemetry já registra as fases
+    # conhecidas zeradas); nomes fora dessa lista só vão para o JSONL
+    file_exists = os.path.exists(csv_path)
+    if file_exists:
+        with open(csv_path, newline="") as file:
+            fields = next(csv.reader(file), None) or list(record)
+    else:
+        fields = list(record)
+    with open(csv_path, mode="a", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=fields, extrasaction="ignore")
+        if not file_exists:
+            writer.writeheader()
+        writer.writerow(record)
@@ -4,11 +4,13 @@ import os
 import numpy as np
 from src.env.solver_env import SolverEnv
 from old_level_generator import LevelGenerator
+from src.solver import SolvabilityFilter
 from src.utils import draw_game_screen
-from plot_utils import plot_batch_summary, save_round_summary_csv
+from plot_utils import plot_batch_summary, save_round_summary_csv, save_round_telemetry
 
 
 from src.scripts.trainer_utils import setup_directories, initialize_environment_and_agent, validate_on_original_game
+from src.agents.telemetry import Telemetry
 import pygame
 
 # ------------------ Configurações Gerais ------------------
@@ -28,28 +30,45 @@ MAX_MEAN = 160                 # Limite superior da média de passos
 GROWTH = 1.25                  # Fator de crescimento da dificuldade
 SUCCESS_THRESHOLD = 0.85       # Taxa mínima de sucesso para aumentar a dificuldade
 WINDOW_SIZE = 300             # Janela para média móvel de taxa de sucesso
+EXTRA_LEVELS = 100             # Fases extras geradas além dos episódios da rodada
+PERSIST_LEVELS = False         # Grava as fases de cada rodada em data/levels/packs (em segundo plano)
+LEVEL_SEED = 0                 # Semente mestre da geração (a rodada r usa LEVEL_SEED + r); None = aleatória
+GENERATION_WORKERS = None      # Processos para gerar fases (None = todos os núcleos, 1 = sob demanda)
+VERIFY_LEVELS = True           # Descarta fases que o solucionador prova insolúveis
+VERIFY_MAX_NODES = 20_000      # Orçamento de nós da verificação por fase
+VERIFY_TIME_LIMIT = 0.25       # Orçamento de tempo (s) por fase; ignorado com LEVEL_SEED (só o de nós vale)
 
 # Agente DQN
 BUFFER_SIZE = 50_000           # Capacidade do replay buffer
 UPDATE_FREQ = 4                # Frequência de atualizações da rede
 MIN_BUFFER_SIZE = 1000         # Tamanho mínimo do buffer antes de treinar
 USE_ACTION_MASK = True  # Altere para False para treinar sem máscara
+PRIORITIZED_REPLAY = False     # Amostragem por prioridade (erro TD) em vez de uniforme
+N_STEP = 1                     # Passos acumulados por retorno (1 = DQN clássico)
 
 
 # Validação
 USE_VALIDATION = False         # Ativa ou não validação periódica nas fases reais
 
+# Telemetria
+TELEMETRY = True               # Tempo por fase e passos/s por rodada em round_telemetry.{csv,jsonl}
 
-def run_episode(env, agent):
+
+def run_episode(env, agent, telemetry):
     s, info = env.reset()
     total_reward, solved = 0, False
     for t in range(STEPS_PER_EP):
-        a = agent.act(s, info["action_mask"] if USE_ACTION_MASK else None)
-        s_next, r, done, truncated, info = env.step(a)
+        with telemetry.phase("act"):
+            a = agent.act(s, info["action_mask"] if USE_ACTION_MASK else None)
+        with telemetry.phase("env_step"):
+            s_next, r, done, truncated, info = env.step(a)
+        telemetry.count("steps")
         if not info["invalid"]:
-            agent.remember(s, a, r, s_next, done or truncated)
+            with telemetry.phase("remember"):
+                agent.remember(s, a, r, s_next, done, truncated=truncated)
         if len(agent.buffer) > MIN_BUFFER_SIZE and t % UPDATE_FREQ == 0:
-            agent.update()
+            with telemetry.phase("update"):
+                agent.update()
         s = s_next
         total_reward += r
         if done or truncated:
@@ -61,19 +80,38 @@ def curriculum_loop(env, agent):
     mean_steps = INITIAL_MEAN
     success_history = []
     tile_ratio_history = []
+    # Com semente, o veredito não pode depender do relógio: cada rejeição consome
+    # sorteios do RNG e mudaria as fases geradas em máquinas mais lentas
+    time_limit = VERIFY_TIME_LIMIT if LEVEL_SEED is None else None
+    verifier = SolvabilityFilter(VERIFY_MAX_NODES, time_limit) if VERIFY_LEVELS else None
+    # As fases internas de update (sample/forward/backward/target_sync) vêm do próprio agente
+    telemetry = Telemetry(enabled=TELEMETRY)
+    agent.telemetry = telemetry if TELEMETRY else None
     for round_id in range(200_000):
-        lg = LevelGenerator(mean_steps=int(mean_steps), std_steps=STD_RATIO)
-        level_dir = lg.build_random_levels(EPISODES_PER_ROUND, extra_levels=100)
+        if verifier is not None:
+            verifier.reset_stats()
+        lg = LevelGenerator(mean_steps=int(mean_steps), std_steps=STD_RATIO, verifier=verifier)
+        # Fases geradas em memória, sob demanda: nada passa pelo disco durante o treino
+        persist_path = os.path.join("data", "levels", "packs", f"round_{round_id:05}.pack") if PERSIST_LEVELS else None
+        with telemetry.phase("level_generation"):
+            level_dir = lg.build_levels_in_memory(
+                EPISODES_PER_ROUND,
+                extra_levels=EXTRA_LEVELS,
+                persist_path=persist_path,
+                seed=None if LEVEL_SEED is None else LEVEL_SEED + round_id,
+                workers=GENERATION_WORKERS,
+            )
         env.change_level_folder(level_dir, 0)
 
         batch_results = []
         for ep in range(EPISODES_PER_ROUND):
-            info, solved = run_episode(env, agent)
+            info, solved = run_episode(env, agent, telemetry)
             batch_results.append(info["result"])
             success_history.append(int(solved))
             tile_ratio_history.append(env.game.current_tiles / env.game.level.total_tiles if solved else 0.0)
 
-        val_ratio = validate_on_original_game(agent, USE_ACTION_MASK) if USE_VALIDATION else 0.0
+        with telemetry.phase("validation"):
+            val_ratio = validate_on_original_game(agent, USE_ACTION_MASK) if USE_VALIDATION else 0.0
 
         success_rate = batch_results.count("SUCCESS") / EPISODES_PER_ROUND
         not_sufficient_rate = batch_results.count("NOT_SUFFICIENT") / EPISODES_PER_ROUND
@@ -84,9 +122,19 @@ def curriculum_loop(env, agent):
             f"Treino: SUCCESS={success_rate:.2%}, NOT_SUFFICIENT={not_sufficient_rate:.2%}, GAME_OVER={game_over_rate:.2%} | "
             f"Validação: {val_ratio:.2f} | Últimos {WINDOW_SIZE}: {np.mean(success_history[-WINDOW_SIZE:]):.2f}"
         )
+        if verifier is not None:
+            print(f"    Fases: {verifier.summary()}")
 
         plot_batch_summary(batch_results, mean_steps, round_id, val_ratio)
         save_round_summary_csv(round_id, batch_results, val_ratio)
+        if TELEMETRY:
+            record = telemetry.end_round(round_id, mean_steps=int(mean_steps), success_rate=success_rate)
+            save_round_telemetry(record)
+            print(
+                f"    Telemetria: {record['steps_per_sec']:.0f} passos/s, {record['updates_per_sec']:.0f} updates/s | "
+                f"geração {record.get('level_generation_s', 0.0):.1f}s, ambiente {record.get('env_step_s', 0.0):.1f}s, "
+                f"backward {record.get('backward_s', 0.0):.1f}s"
+            )
 
         recent_success = np.mean(success_history[-WINDOW_SIZE:])
         if recent_success > SUCCESS_THRESHOLD and mean_steps < MAX_MEAN:
@@ -112,7 +160,9 @@ def main():
         steps_per_episode=STEPS_PER_EP,
         buffer_size=BUFFER_SIZE,
         allow_failure_progression=ALLOW_FAILURE_PROGRESSION,
-        use_action_mask=USE_ACTION_MASK
+        use_action_mask=USE_ACTION_MASK,
+        prioritized_replay=PRIORITIZED_REPLAY,
+        n_step=N_STEP
     )
     curriculum_loop(env, agent)
     if USE_PYGAME:
@@ -0,0 +1,63 @@
+# src/scripts/train_async.py
+#
+# Treino DQN no modo ator/aprendiz: os atores rodam os ambientes em processos
+# separados e o aprendiz treina continuamente com o que chega.
+
+import os
+
+from src.agents.actor_learner import AsyncTrainer
+from src.agents.dqn_agent import DQNAgent
+from src.learning.observation import OBS_SHAPE
+
+# ------------------ Configurações Gerais ------------------
+
+NUM_ACTORS = max(1, (os.cpu_count() or 2) - 1)  # Um núcleo fica para o aprendiz
+ENVS_PER_ACTOR = 8             # Ambientes vetorizados por ator
+LEVEL_FOLDER = "original_game" # Conjunto de fases usado pelos atores
+STEPS_PER_EP = 400             # Passos até truncar o episódio
+RING_STEPS = 256               # Passos que cabem no anel compartilhado de cada ator
+SYNC_EVERY = 200               # Atualizações entre publicações dos pesos
+TOTAL_UPDATES = 200_000        # Atualizações do aprendiz
+
+# Agente DQN
+BUFFER_SIZE = 500_000          # Capacidade do replay buffer
+MIN_BUFFER_SIZE = 5000         # Tamanho mínimo do buffer antes de treinar
+PRIORITIZED_REPLAY = True      # Amostragem por prioridade (erro TD)
+N_STEP = 3                     # Passos acumulados por retorno
+
+MODEL_PATH = "models/freitas/dqn_agent_async.pth"
+
+
+def main():
+    agent = DQNAgent(
+        state_shape=OBS_SHAPE,
+        n_actions=4,
+        buffer_size=BUFFER_SIZE,
+        packed_buffer=True,
+        prioritized=PRIORITIZED_REPLAY,
+        n_step=N_STEP,
+    )
+    if os.path.exists(MODEL_PATH):
+        print(f"[✓] Carregando modelo salvo de {MODEL_PATH}")
+        agent.load(MODEL_PATH)
+
+    trainer = AsyncTrainer(
+        agent,
+        num_actors=NUM_ACTORS,
+        envs_per_actor=ENVS_PER_ACTOR,
+        level_folder=LEVEL_FOLDER,
+        max_steps=STEPS_PER_EP,
+        ring_steps=RING_STEPS,
+        sync_every=SYNC_EVERY,
+        min_buffer_size=MIN_BUFFER_SIZE,
+    )
+    stats = trainer.run(TOTAL_UPDATES)
+    print(f"[✓] {stats['updates']} atualizações, {stats['transitions']} transições, "
+          f"{stats['successes']} fases concluídas")
+
+    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+    agent.save(MODEL_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -42,7 +42,9 @@ def initialize_environment_and_agent(
     steps_per_episode: int,
     buffer_size: int,
     allow_failure_progression: bool,
-    use_action_mask: bool = True
+    use_action_mask: bool = True,
+    prioritized_replay: bool = False,
+    n_step: int = 1
 ):
     env = SolverEnv(
         level_folder="original_game",
@@ -56,7 +58,9 @@ def initialize_environment_and_agent(
     agent = DQNAgent(
         state_shape=env.observation_space.shape,
         n_actions=env.action_space.n,
-        buffer_size=buffer_size
+        buffer_size=buffer_size,
+        prioritized=prioritized_replay,
+        n_step=n_step
     )
     agent.use_action_mask = use_action_mask  # novo atributo controlado aqui
 
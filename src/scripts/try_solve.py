@@ -2,21 +2,17 @@
 import numpy as np
 from pathlib import Path
 from src.env.solver_env import SolverEnv
-from src.agents.dqn_agent import DQNAgent
+from src.agents.numpy_policy import PolicyRunner
 
-MODEL_PATH   = Path("models/freitas/dqn_agent_22.pth")
+# Política exportada (só NumPy): python -m src.agents.numpy_policy dqn models/freitas/dqn_agent_22.pth <saída>
+MODEL_PATH   = Path("models/freitas/dqn_agent_22.npz")
 LEVEL_FOLDER = "original_game"      # ou a pasta que quiser testar
 MAX_STEPS    = 300                  # igual ao treino
 
 def main():
     # ambiente zerado
     env   = SolverEnv(level_index=0, level_folder=LEVEL_FOLDER)
-    agent = DQNAgent(
-        state_shape=env.observation_space.shape,
-        n_actions=env.action_space.n,
-    )
-    agent.load(MODEL_PATH)
-    agent.epsilon = 0.0             # greedy puro – sem exploração
+    agent = PolicyRunner(MODEL_PATH)  # greedy puro – sem exploração
 
     total_levels   = 0
     solved_levels  = 0
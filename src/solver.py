@@ -0,0 +1,608 @@
+# /src/solver.py
+#
+# Solucionador exato de fases: busca em profundidade sobre o estado completo
+# do jogo (tiles, itens, jogador, chaves) com as mesmas regras de Game +
+# ThinIceEnv.step (blocos deslizam até bater). Estados já refutados ficam numa
+# tabela de transposição indexada por hash de Zobrist, e cada nó passa por
+# podas baratas antes de ser expandido:
+#
+#   * conectividade: a saída precisa ser alcançável e, no modo perfeito, o gelo
+#     ainda alcançável precisa render movimentos suficientes para completar
+#     total_tiles (gelo desconectado ou já derretido derruba essa capacidade);
+#   * becos sem saída: regiões penduradas numa articulação (inclusive células
+#     isoladas) só são aproveitadas indo e voltando por ela, o que limita
+#     quantas contam; atrás de gelo fino elas não contam nada;
+#   * paridade: sem teletransportes ativos cada movimento troca a cor do
+#     tabuleiro de xadrez, então os movimentos restantes e a distância de
+#     Manhattan até a saída precisam ter a mesma paridade.
+#
+# Os movimentos são ordenados pela regra de Warnsdorff (primeiro as células
+# com menos saídas, gelo grosso no empate), deixando a saída por último.
+
+import hashlib
+import random
+import time
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.mapping import Map, Item, BLOCKING_TILES, SOLID_TILES, GRID_HEIGHT, GRID_WIDTH
+
+CELLS = GRID_HEIGHT * GRID_WIDTH
+
+WALL = Map.WALL.value
+THIN_ICE = Map.THIN_ICE.value
+THICK_ICE = Map.THICK_ICE.value
+LOCK = Map.LOCK.value
+TILE = Map.TILE.value
+TELEPORT = Map.TELEPORT.value
+FINISH = Map.FINISH.value
+WATER = Map.WATER.value
+
+COIN_BAG = int(Item.COIN_BAG)
+KEY = int(Item.KEY)
+BLOCK = int(Item.BLOCK)
+
+_BLOCKING = [bool(v) for v in BLOCKING_TILES]
+_SOLID = [bool(v) for v in SOLID_TILES]
+
+# Ações do ambiente: 0=cima, 1=baixo, 2=esquerda, 3=direita
+ACTION_DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+def _neighbour(cell: int, dx: int, dy: int) -> int:
+    x, y = cell % GRID_WIDTH + dx, cell // GRID_WIDTH + dy
+    return y * GRID_WIDTH + x if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT else -1
+
+
+# STEP[cell][ação] = célula vizinha (índice achatado) ou -1 fora do grid
+STEP = [tuple(_neighbour(cell, dx, dy) for dx, dy in ACTION_DELTAS) for cell in range(CELLS)]
+# Vizinhos na ordem (dr, dc) de Game.check_lock: importa quando há mais trancas que chaves
+LOCK_NEIGHBOURS = [
+    tuple(n for n in (_neighbour(cell, dc, dr) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))) if n >= 0)
+    for cell in range(CELLS)
+]
+ADJACENT = [tuple(n for n in STEP[cell] if n >= 0) for cell in range(CELLS)]
+
+# Chaves de Zobrist (semente fixa: hashes estáveis entre execuções)
+_zobrist_rng = random.Random(0x7E1CE)
+ZOBRIST_TILE = [[_zobrist_rng.getrandbits(64) for _ in range(len(Map))] for _ in range(CELLS)]
+ZOBRIST_ITEMS = [[_zobrist_rng.getrandbits(64) for _ in range(8)] for _ in range(CELLS)]
+ZOBRIST_PLAYER = [_zobrist_rng.getrandbits(64) for _ in range(CELLS)]
+ZOBRIST_KEYS = [_zobrist_rng.getrandbits(64) for _ in range(64)]
+ZOBRIST_MOVES = [_zobrist_rng.getrandbits(64) for _ in range(2 * CELLS + 2)]
+
+SOLVED = "SOLVED"
+UNSOLVABLE = "UNSOLVABLE"
+BUDGET_EXCEEDED = "BUDGET_EXCEEDED"
+
+_INFINITE = CELLS * 4
+
+
+class SolverResult:
+    """Resultado de uma busca: status, ações do ambiente até a saída e custo da busca."""
+
+    def __init__(self, status: str, actions: List[int], nodes: int, elapsed: float,
+                 tiles: int = 0, points: int = 0):
+        self.status = status
+        self.actions = actions    # 0=cima, 1=baixo, 2=esquerda, 3=direita
+        self.nodes = nodes        # nós expandidos
+        self.elapsed = elapsed    # segundos
+        self.tiles = tiles        # current_tiles ao chegar na saída
+        self.points = points      # current_points ao chegar na saída (sem o bônus de 2 por tile)
+
+    @property
+    def solved(self) -> bool:
+        return self.status == SOLVED
+
+    def __repr__(self) -> str:
+        return (f"SolverResult({self.status}, moves={len(self.actions)}, tiles={self.tiles}, "
+                f"points={self.points}, nodes={self.nodes}, elapsed={self.elapsed:.3f}s)")
+
+
+class ThinIceSolver:
+    """Busca um caminho até FINISH a partir de um estado de fase.
+
+    Com `perfect_score_required` o objetivo é o mesmo de Game.check_progress
+    no modo perfeito: chegar à saída com current_tiles == total_tiles (em
+    fases sem trancas nem tiles comuns, todo o gelo derretido). Sem ele,
+    qualquer caminho até a saída serve. `solve(max_nodes, time_limit)`
+    limita a busca; se o limite estourar o status é BUDGET_EXCEEDED (nada
+    foi provado).
+    """
+
+    def __init__(self, grid, items, start, teleport_cells, teleport_exit, total_tiles,
+                 perfect_score_required: bool = True, keys_obtained: int = 0,
+                 current_tiles: int = 0, current_points: int = 0):
+        self.grid = bytearray(int(v) for row in grid for v in row)
+        self.items = bytearray(int(v) for row in items for v in row)
+        self.player = int(start[1]) * GRID_WIDTH + int(start[0])
+        self.keys = int(keys_obtained)
+        self.moves = int(current_tiles)
+        self.points = int(current_points)
+        self.total_tiles = int(total_tiles)
+        self.perfect_score_required = perfect_score_required
+
+        self.teleport_cells = [int(y) * GRID_WIDTH + int(x) for x, y in teleport_cells]
+        self.teleport_exit = [-1] * CELLS
+        for cell in self.teleport_cells:
+            ex, ey = (int(v) for v in teleport_exit[cell // GRID_WIDTH, cell % GRID_WIDTH])
+            if ex >= 0:
+                self.teleport_exit[cell] = ey * GRID_WIDTH + ex
+        self.finish_cells = [cell for cell in range(CELLS) if self.grid[cell] == FINISH]
+        self.keys_left = sum(1 for v in self.items if v & KEY)  # chaves ainda no chão
+
+        self.hash = ZOBRIST_PLAYER[self.player] ^ ZOBRIST_KEYS[self.keys]
+        for cell in range(CELLS):
+            self.hash ^= ZOBRIST_TILE[cell][self.grid[cell]] ^ ZOBRIST_ITEMS[cell][self.items[cell]]
+
+        self._log = []     # (é_tile, célula, valor antigo) para desfazer
+        self._frames = []  # (tamanho do log, jogador, chaves, chaves no chão, movimentos, pontos, hash)
+        self.failed = set()  # tabela de transposição: estados sem solução
+        self.nodes = 0
+
+    @classmethod
+    def from_level(cls, level, perfect_score_required: bool = True) -> "ThinIceSolver":
+        """Estado inicial de um Level ou LevelTemplate."""
+        return cls(level.grid, level.items, level.start, level.teleport_cells, level.teleport_exit,
+                   level.total_tiles, perfect_score_required)
+
+    @classmethod
+    def from_game(cls, game, perfect_score_required: Optional[bool] = None) -> "ThinIceSolver":
+        """Estado atual de um Game (posição, chaves e tiles já percorridos)."""
+        level = game.level
+        perfect = game.perfect_score_required if perfect_score_required is None else perfect_score_required
+        return cls(level.grid, level.items, (game.player_x, game.player_y), level.teleport_cells,
+                   level.teleport_exit, level.total_tiles, perfect, keys_obtained=game.keys_obtained,
+                   current_tiles=game.current_tiles, current_points=game.current_points - game.points)
+
+    def _distances(self, targets: List[int]) -> List[int]:
+        """Distância de cada célula até o alvo mais próximo no grid atual (blocos ignorados)."""
+        grid = self.grid
+        locks_open = self.keys > 0
+        dist = [_INFINITE] * CELLS
+        queue = deque(targets)
+        for cell in targets:
+            dist[cell] = 0
+        while queue:
+            cell = queue.popleft()
+            for nxt in ADJACENT[cell]:
+                tile = grid[nxt]
+                if dist[nxt] == _INFINITE and not _SOLID[tile] and (locks_open or tile != LOCK):
+                    dist[nxt] = dist[cell] + 1
+                    queue.append(nxt)
+        return dist
+
+    # ---------- Estado ----------
+
+    def _set_tile(self, cell: int, value: int) -> None:
+        old = self.grid[cell]
+        self._log.append((True, cell, old))
+        self.grid[cell] = value
+        self.hash ^= ZOBRIST_TILE[cell][old] ^ ZOBRIST_TILE[cell][value]
+
+    def _set_items(self, cell: int, value: int) -> None:
+        old = self.items[cell]
+        self._log.append((False, cell, old))
+        self.items[cell] = value
+        self.hash ^= ZOBRIST_ITEMS[cell][old] ^ ZOBRIST_ITEMS[cell][value]
+
+    def _push_block(self, block: int, action: int) -> int:
+        """Game.move_block: um passo do bloco; retorna a nova posição ou -1 se parou."""
+        target = STEP[block][action]
+        if target < 0 or _BLOCKING[self.grid[target]]:
+            return -1
+        if self.grid[target] == TELEPORT and self.teleport_exit[target] >= 0:
+            target = self.teleport_exit[target]
+        self._set_items(block, self.items[block] & ~BLOCK)
+        self._set_items(target, self.items[target] | BLOCK)
+        return target
+
+    def apply(self, action: int) -> bool:
+        """Executa a ação como ThinIceEnv.step (sem check_progress); False se o jogador não se move."""
+        grid, items = self.grid, self.items
+        player = self.player
+        target = STEP[player][action]
+        if target < 0 or _BLOCKING[grid[target]]:
+            return False
+        has_block = items[target] & BLOCK
+        if has_block:
+            beyond = STEP[target][action]
+            if beyond < 0 or _BLOCKING[grid[beyond]]:
+                return False
+
+        self._frames.append((len(self._log), player, self.keys, self.keys_left, self.moves, self.points,
+                             self.hash))
+        # Primeiro passo do bloco acontece antes do gelo derreter
+        block = self._push_block(target, action) if has_block else -1
+
+        tile = grid[player]
+        if tile == THIN_ICE:
+            self._set_tile(player, WATER)
+        elif tile == THICK_ICE:
+            self._set_tile(player, THIN_ICE)
+
+        keys = self.keys
+        if keys:
+            for cell in LOCK_NEIGHBOURS[target]:
+                if grid[cell] == LOCK and keys > 0:
+                    keys -= 1
+                    self._set_tile(cell, THIN_ICE)
+
+        if grid[target] == TELEPORT:
+            exit_cell = self.teleport_exit[target]
+            for cell in self.teleport_cells:
+                self._set_tile(cell, TILE)
+            if exit_cell >= 0:
+                target = exit_cell
+
+        self.moves += 1
+        self.points += 1
+        if items[target] & COIN_BAG:
+            self.points += 100
+            self._set_items(target, items[target] & ~COIN_BAG)
+        if items[target] & KEY:
+            keys += 1
+            self.keys_left -= 1
+            self._set_items(target, items[target] & ~KEY)
+
+        while block >= 0:
+            block = self._push_block(block, action)
+
+        self.hash ^= ZOBRIST_PLAYER[player] ^ ZOBRIST_PLAYER[target] ^ ZOBRIST_KEYS[self.keys] ^ ZOBRIST_KEYS[keys]
+        self.player = target
+        self.keys = keys
+        return True
+
+    def undo(self) -> None:
+        mark, self.player, self.keys, self.keys_left, self.moves, self.points, self.hash = self._frames.pop()
+        log = self._log
+        while len(log) > mark:
+            is_tile, cell, old = log.pop()
+            if is_tile:
+                self.grid[cell] = old
+            else:
+                self.items[cell] = old
+
+    # ---------- Podas ----------
+
+    def _state_key(self) -> int:
+        return self.hash ^ ZOBRIST_MOVES[self.moves] if self.perfect_score_required else self.hash
+
+    def _is_goal(self) -> bool:
+        return not self.perfect_score_required or self.moves == self.total_tiles
+
+    def _feasible(self) -> bool:
+        """Limites inferiores/superiores baratos; False prova que o estado não tem solução."""
+        grid = self.grid
+        remaining = self.total_tiles - self.moves
+        teleports_active = any(grid[cell] == TELEPORT for cell in self.teleport_cells)
+
+        if self.perfect_score_required and remaining <= 0:
+            return False
+
+        # Paridade: sem teletransportes, cada movimento troca a cor da casa
+        if self.perfect_score_required and not teleports_active:
+            px, py = self.player % GRID_WIDTH, self.player // GRID_WIDTH
+            if all((remaining - abs(px - f % GRID_WIDTH) - abs(py - f // GRID_WIDTH)) % 2
+                   for f in self.finish_cells):
+                return False
+
+        finish_reachable, capacity = self._reachable_capacity()
+        if not finish_reachable:
+            return False
+        return not self.perfect_score_required or capacity >= remaining
+
+    def _cell_capacity(self, cell: int) -> int:
+        """Quantas vezes o jogador ainda pode sair da célula (cada saída é um movimento)."""
+        tile = self.grid[cell]
+        if tile == THIN_ICE or tile == LOCK:  # a tranca vira gelo fino ao abrir
+            return 1
+        if tile == THICK_ICE:
+            return 2
+        if tile == FINISH or _SOLID[tile]:
+            return 0
+        return _INFINITE  # tiles que não derretem
+
+    def _graph_neighbours(self, cell: int, locks_open: bool) -> List[int]:
+        grid = self.grid
+        neighbours = [n for n in ADJACENT[cell] if not _SOLID[grid[n]] and (locks_open or grid[n] != LOCK)]
+        if grid[cell] == TELEPORT and self.teleport_exit[cell] >= 0:
+            neighbours.append(self.teleport_exit[cell])
+        return neighbours
+
+    def _reachable_capacity(self):
+        """(saída alcançável?, limite superior de movimentos restantes).
+
+        DFS de Tarjan a partir do jogador sobre o grafo otimista (trancas
+        abertas se ainda houver chave, blocos ignorados, teletransportes como
+        arestas). Uma
+        subárvore separada do resto por uma célula u (u é articulação) e que
+        não encosta na saída só é aproveitada indo e voltando por u, e u
+        ainda precisa ser deixado uma última vez rumo à saída: cabem no
+        máximo capacidade(u) - 1 dessas viagens, então só as maiores
+        subárvores contam. Gelo fino isolando uma região (ou um beco) zera
+        a capacidade dela; gelo desconectado nem é visitado.
+        """
+        grid = self.grid
+        root = self.player
+        locks_open = self.keys > 0 or self.keys_left > 0
+        disc = [-1] * CELLS
+        low = [0] * CELLS
+        usable = [0] * CELLS         # capacidade aproveitável da subárvore
+        touches_finish = [False] * CELLS
+        hanging = {}                 # célula -> capacidades das subárvores penduradas nela
+
+        disc[root] = 0
+        counter = 1
+        stack = [(root, iter(self._graph_neighbours(root, locks_open)))]
+        while stack:
+            cell, neighbours = stack[-1]
+            descended = False
+            for nxt in neighbours:
+                if grid[nxt] == FINISH:
+                    touches_finish[cell] = True  # a saída encerra a fase: não se passa por ela
+                elif disc[nxt] < 0:
+                    disc[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append((nxt, iter(self._graph_neighbours(nxt, locks_open))))
+                    descended = True
+                    break
+                elif disc[nxt] < low[cell]:
+                    low[cell] = disc[nxt]
+            if descended:
+                continue
+
+            stack.pop()
+            capacity = self._cell_capacity(cell)
+            trips = hanging.pop(cell, None)
+            if trips:
+                if capacity < _INFINITE:
+                    trips = sorted(trips, reverse=True)[:capacity - 1]
+                usable[cell] += sum(trips)
+            usable[cell] = min(usable[cell] + capacity, _INFINITE)
+
+            if stack:
+                parent = stack[-1][0]
+                if low[cell] < low[parent]:
+                    low[parent] = low[cell]
+                if touches_finish[cell]:
+                    touches_finish[parent] = True
+                    usable[parent] += usable[cell]
+                elif low[cell] >= disc[parent]:
+                    hanging.setdefault(parent, []).append(usable[cell])
+                else:
+                    usable[parent] += usable[cell]
+
+        return touches_finish[root], usable[root]
+
+    def _ordered_actions(self) -> List[int]:
+        grid = self.grid
+        candidates = []
+        if not self.perfect_score_required:
+            # Sem perfeito basta chegar: vai direto para a saída, ou antes buscar uma chave se a saída está trancada
+            distance = self._distances(self.finish_cells)
+            if distance[self.player] == _INFINITE and self.keys_left:
+                distance = self._distances([cell for cell in range(CELLS) if self.items[cell] & KEY])
+        for action, target in enumerate(STEP[self.player]):
+            if target < 0 or _BLOCKING[grid[target]]:
+                continue
+            if grid[target] == FINISH:
+                # A saída só interessa se fecha a fase agora
+                if self.moves + 1 != self.total_tiles and self.perfect_score_required:
+                    continue
+                candidates.append((-1, False, action))
+                continue
+            if self.perfect_score_required:
+                onward = sum(1 for n in ADJACENT[target] if n != self.player and not _BLOCKING[grid[n]])
+                # Empate: gelo grosso primeiro (a segunda passagem costuma ser o que falta fechar)
+                candidates.append((onward, grid[target] != THICK_ICE, action))
+            else:
+                candidates.append((distance[target], False, action))
+        candidates.sort()
+        return [action for _, _, action in candidates]
+
+    # ---------- Busca ----------
+
+    def solve(self, max_nodes: Optional[int] = None, time_limit: Optional[float] = None) -> SolverResult:
+        """Busca em profundidade iterativa (sem recursão) a partir do estado atual."""
+        started = time.perf_counter()
+        deadline = None if time_limit is None else started + time_limit
+        path: List[int] = []
+        self.nodes = 0
+
+        def result(status: str) -> SolverResult:
+            elapsed = time.perf_counter() - started
+            if status == SOLVED:
+                return SolverResult(status, list(path), self.nodes, elapsed, self.moves, self.points)
+            return SolverResult(status, [], self.nodes, elapsed)
+
+        if self.grid[self.player] == FINISH:
+            return result(SOLVED if self._is_goal() else UNSOLVABLE)
+        if not self._feasible():
+            return result(UNSOLVABLE)
+
+        # Estados do caminho atual: sem exigir pontuação perfeita a chave não tem o
+        # contador de movimentos e o jogador pode repetir estados (TILE, teletransporte)
+        root = self._state_key()
+        on_path = {root}
+        stack = [(root, self._ordered_actions(), [0])]
+        while stack:
+            key, actions, cursor = stack[-1]
+            if cursor[0] == len(actions):
+                self.failed.add(key)
+                on_path.discard(key)
+                stack.pop()
+                if stack:
+                    self.undo()
+                    path.pop()
+                continue
+
+            action = actions[cursor[0]]
+            cursor[0] += 1
+            if not self.apply(action):
+                continue
+            path.append(action)
+            self.nodes += 1
+
+            if max_nodes is not None and self.nodes >= max_nodes:
+                return self._abort(path, result)
+            if deadline is not None and (self.nodes & 1023) == 0 and time.perf_counter() > deadline:
+                return self._abort(path, result)
+
+            if self.grid[self.player] == FINISH:
+                if self._is_goal():
+                    solution = result(SOLVED)
+                    self._rewind(len(path))
+                    return solution
+                self.undo()
+                path.pop()
+                continue
+
+            child = self._state_key()
+            if child in on_path:  # ciclo: nada de novo a partir daqui
+                self.undo()
+                path.pop()
+                continue
+            if child in self.failed or not self._feasible():
+                self.failed.add(child)
+                self.undo()
+                path.pop()
+                continue
+            on_path.add(child)
+            stack.append((child, self._ordered_actions(), [0]))
+
+        return result(UNSOLVABLE)
+
+    def _rewind(self, steps: int) -> None:
+        for _ in range(steps):
+            self.undo()
+
+    def _abort(self, path, result) -> SolverResult:
+        aborted = result(BUDGET_EXCEEDED)
+        self._rewind(len(path))
+        return aborted
+
+
+def solve_level(level, perfect_score_required: bool = True, max_nodes: Optional[int] = None,
+                time_limit: Optional[float] = None) -> SolverResult:
+    """Resolve um Level/LevelTemplate a partir do início."""
+    return ThinIceSolver.from_level(level, perfect_score_required).solve(max_nodes, time_limit)
+
+
+def solve_game(game, perfect_score_required: Optional[bool] = None, max_nodes: Optional[int] = None,
+               time_limit: Optional[float] = None) -> SolverResult:
+    """Resolve a fase atual de um Game a partir da posição atual do jogador."""
+    return ThinIceSolver.from_game(game, perfect_score_required).solve(max_nodes, time_limit)
+
+
+def level_hash(level) -> bytes:
+    """Hash do estado inicial de um Level/LevelTemplate (grid, itens, início e teletransportes)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(bytes(level.grid.astype("uint8").ravel()))
+    digest.update(bytes(level.items.astype("uint8").ravel()))
+    digest.update(repr((tuple(level.start), level.teleport_cells.tolist(), int(level.total_tiles))).encode())
+    return digest.digest()
+
+
+class SolvabilityFilter:
+    """Verificação rápida de fases geradas: busca limitada por fase, com cache por hash.
+
+    `accept(level)` roda o solucionador com `max_nodes`/`time_limit` e
+    rejeita fases provadas insolúveis. Fases que estouram o orçamento são
+    aceitas, a menos que `reject_on_budget`. Com `time_limit` o veredito
+    depende do relógio; para geração com semente reprodutível use só
+    `max_nodes` (time_limit=None). Os contadores em `stats` são
+    zerados com `reset_stats()` (ex.: a cada rodada do currículo); o cache
+    sobrevive entre rodadas. Com um pool de processos, cada tarefa trabalha
+    numa cópia do filtro e quem a criou junta os resultados com
+    `merge_stats` e `merge_cache` (ver LevelGenerator.generate_levels).
+    """
+
+    def __init__(self, max_nodes: Optional[int] = 20_000, time_limit: Optional[float] = 0.25,
+                 perfect_score_required: bool = True, reject_on_budget: bool = False):
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.perfect_score_required = perfect_score_required
+        self.reject_on_budget = reject_on_budget
+        self.cache: Dict[bytes, str] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats = {
+            "checked": 0,
+            "accepted": 0,
+            "rejected_unsolvable": 0,
+            "rejected_budget": 0,
+            "budget_exceeded": 0,
+            "cache_hits": 0,
+            "nodes": 0,
+            "seconds": 0.0,
+        }
+
+    def merge_stats(self, stats: Dict[str, float]) -> None:
+        """Soma contadores vindos de outra cópia do filtro (ex.: de um processo do pool)."""
+        for key, value in stats.items():
+            self.stats[key] += value
+
+    def new_cache_entries(self, known: int) -> List[Tuple[bytes, str]]:
+        """Entradas do cache inseridas depois das `known` primeiras (o dict preserva a ordem)."""
+        return list(islice(self.cache.items(), known, None))
+
+    def merge_cache(self, entries: Iterable[Tuple[bytes, str]]) -> None:
+        """Junta veredictos vindos de outra cópia do filtro."""
+        self.cache.update(entries)
+
+    def status(self, level) -> str:
+        key = level_hash(level)
+        status = self.cache.get(key)
+        if status is not None:
+            self.stats["cache_hits"] += 1
+            return status
+        result = solve_level(level, self.perfect_score_required, self.max_nodes, self.time_limit)
+        self.stats["nodes"] += result.nodes
+        self.stats["seconds"] += result.elapsed
+        self.cache[key] = result.status
+        return result.status
+
+    def accept(self, level) -> bool:
+        status = self.status(level)
+        self.stats["checked"] += 1
+        if status == BUDGET_EXCEEDED:
+            self.stats["budget_exceeded"] += 1
+            if self.reject_on_budget:
+                self.stats["rejected_budget"] += 1
+                return False
+        elif status == UNSOLVABLE:
+            self.stats["rejected_unsolvable"] += 1
+            return False
+        self.stats["accepted"] += 1
+        return True
+
+    def summary(self) -> str:
+        stats = self.stats
+        checked = max(stats["checked"], 1)
+        rejected = stats["rejected_unsolvable"] + stats["rejected_budget"]
+        return (f"verificadas={stats['checked']} rejeitadas={rejected} ({rejected / checked:.1%}; "
+                f"insolúveis={stats['rejected_unsolvable']}, orçamento={stats['budget_exceeded']}) "
+                f"cache={stats['cache_hits']} nós={stats['nodes']} tempo={stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.levels import count_levels, load_level_template
+
+    parser = argparse.ArgumentParser(description="Resolve as fases de uma pasta com busca exata")
+    parser.add_argument("folder", nargs="?", default="original_game")
+    parser.add_argument("--index", type=int, default=None, help="resolve só esta fase")
+    parser.add_argument("--any", action="store_true", help="aceita qualquer caminho até a saída (sem perfeito)")
+    parser.add_argument("--max-nodes", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=None, help="segundos por fase")
+    args = parser.parse_args()
+
+    indices = [args.index] if args.index is not None else range(count_levels(args.folder))
+    for index in indices:
+        res = solve_level(load_level_template(args.folder, index), not args.any, args.max_nodes, args.time_limit)
+        print(f"[{'✓' if res.solved else 'x'}] Fase {index:03d}: {res.status:<15} "
+              f"{len(res.actions):4d} movimentos  {res.nodes:8d} nós  {res.elapsed:7.3f}s")
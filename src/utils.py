@@ -1,8 +1,10 @@
 # src/util.py
 
+import numpy as np
 import pygame
 from src.mapping import Map, get_color
 from src.game import Game
+from src.renderer import FrameRenderer
 
 def init_screen():
     pygame.init()
@@ -91,4 +93,85 @@ def draw_game_screen(game, screen, font):
         screen,
         PLAYER,
         (game.player_x * CELL_SIZE, (game.player_y + 1) * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-    )
\ No newline at end of file
+    )
+
+
+class GameScreenRenderer:
+    """Desenho incremental da tela de jogo (mesmo layout de draw_game_screen).
+
+    Guarda o código de sprite (tile + item/jogador) de cada célula desenhada
+    e, a cada quadro, só reblita as células cujo código mudou. O fundo de
+    cada fase (estado inicial do tabuleiro) fica em cache por
+    (pasta, fase), então reiniciar ou voltar a uma fase não redesenha tudo;
+    os textos do HUD só são renderizados quando o valor muda. `draw()`
+    devolve os retângulos alterados, para `pygame.display.update(rects)`.
+    """
+
+    CELL_SIZE = 32
+    WHITE = (218, 240, 255)
+    TEXT = (0, 78, 158)
+    # Posição de cada campo do HUD, como em draw_game_screen
+    HUD_POSITIONS = {"level": (54, 4), "progress": (257, 4), "solved": (437, 4), "points": (438, 16 * 32 + 4)}
+
+    def __init__(self, screen, font):
+        self.screen = screen
+        self.font = font
+        self.frames = FrameRenderer(self.CELL_SIZE)
+        # Um sprite por código do atlas, convertido para Surface uma única vez
+        self.sprites = [pygame.surfarray.make_surface(sprite.transpose(1, 0, 2)) for sprite in self.frames.atlas]
+        self.backgrounds = {}  # (pasta, fase) -> (Surface do tabuleiro, códigos)
+        self.level_key = None
+        self.codes = None
+        self.hud = {}  # campo -> (texto, retângulo ocupado)
+
+    def _codes(self, game):
+        level = game.level
+        return self.frames.codes(level.grid[None], level.items[None], [game.player_x], [game.player_y])[0]
+
+    def _board_surface(self, codes):
+        board = pygame.Surface((codes.shape[1] * self.CELL_SIZE, codes.shape[0] * self.CELL_SIZE))
+        board.blits([(self.sprites[code], (x * self.CELL_SIZE, y * self.CELL_SIZE))
+                     for (y, x), code in np.ndenumerate(codes)])
+        return board
+
+    def invalidate(self):
+        """Força redesenho completo no próximo quadro (ex.: a janela foi coberta)."""
+        self.level_key = None
+        self.hud = {}
+
+    def draw(self, game):
+        rects = []
+        key = (game.level.level_folder, game.level.current_level_id)
+        codes = self._codes(game)
+        if key != self.level_key:
+            if key not in self.backgrounds:
+                self.backgrounds[key] = (self._board_surface(codes), codes)
+            board, self.codes = self.backgrounds[key]
+            if self.level_key is None:  # primeiro quadro: tela inteira
+                self.screen.fill(self.WHITE)
+                rects.append(self.screen.get_rect())
+            rects.append(self.screen.blit(board, (0, self.CELL_SIZE)))
+            self.level_key = key
+
+        # Só as células que mudaram desde o último quadro
+        cell = self.CELL_SIZE
+        for y, x in zip(*np.nonzero(codes != self.codes)):
+            rects.append(self.screen.blit(self.sprites[codes[y, x]], (x * cell, (y + 1) * cell)))
+        self.codes = codes
+
+        values = {
+            "level": f"LEVEL {game.level.current_level_id + 1}",
+            "progress": f"{game.current_tiles} / {game.level.total_tiles}",
+            "solved": f"SOLVED {game.solved}",
+            "points": f"POINTS {game.current_points}",
+        }
+        for name, text in values.items():
+            previous = self.hud.get(name)
+            if previous is not None and previous[0] == text:
+                continue
+            if previous is not None:
+                self.screen.fill(self.WHITE, previous[1])
+            rect = self.screen.blit(self.font.render(text, True, self.TEXT), self.HUD_POSITIONS[name])
+            rects.append(rect if previous is None else rect.union(previous[1]))
+            self.hud[name] = (text, rect)
+        return rects